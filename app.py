@@ -1,154 +1,24 @@
 import streamlit as st
-import re
-import io
-import requests
 from datetime import datetime
 
-# Try to import optional dependencies with fallbacks
-try:
-    from newspaper import Article
-    NEWSPAPER_AVAILABLE = True
-except ImportError:
-    NEWSPAPER_AVAILABLE = False
-
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
-
-try:
-    from bs4 import BeautifulSoup
-    BS4_AVAILABLE = True
-except ImportError:
-    BS4_AVAILABLE = False
-
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-
-# Enhanced URL content extraction
-def extract_url_content_enhanced(url):
-    """Extract content from URL using BeautifulSoup for better results"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive'
-        }
-        
-        response = requests.get(url, timeout=15, headers=headers)
-        response.raise_for_status()
-        
-        if BS4_AVAILABLE:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']):
-                element.decompose()
-            
-            # Try to find main content areas
-            content_areas = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_=re.compile(r'content|article|post|story', re.I)) or
-                soup.find('div', id=re.compile(r'content|article|post|story', re.I))
-            )
-            
-            if content_areas:
-                # Extract text from paragraphs within content area
-                paragraphs = content_areas.find_all(['p', 'div'], string=True)
-                content_text = []
-                
-                for p in paragraphs:
-                    text = p.get_text().strip()
-                    if len(text) > 50:  # Only meaningful paragraphs
-                        content_text.append(text)
-                
-                if content_text:
-                    result = '\n\n'.join(content_text[:15])  # First 15 paragraphs
-                else:
-                    # Fallback to all paragraphs
-                    all_paragraphs = soup.find_all('p')
-                    content_text = [p.get_text().strip() for p in all_paragraphs if len(p.get_text().strip()) > 30]
-                    result = '\n\n'.join(content_text[:20])
-            else:
-                # Fallback to all text
-                result = soup.get_text()
-                # Clean up excessive whitespace
-                result = re.sub(r'\n\s*\n', '\n\n', result)
-                result = re.sub(r' +', ' ', result)
-            
-            return result.strip(), f"📰 Source: {url}"
-        else:
-            # Fallback to basic extraction
-            return extract_url_content_basic(url)
-            
-    except Exception as e:
-        return None, f"❌ Enhanced URL extraction failed: {str(e)}"
-
-# Basic URL content extraction without beautifulsoup
-def extract_url_content_basic(url):
-    """Extract content from URL using basic requests and regex"""
-    try:
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        response.raise_for_status()
-        
-        html = response.text
-        
-        # Remove script and style tags
-        html = re.sub(r'<script.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<style.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<nav.*?</nav>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<header.*?</header>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r'<footer.*?</footer>', '', html, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Extract text from paragraphs specifically
-        paragraphs = re.findall(r'<p[^>]*>(.*?)</p>', html, re.DOTALL | re.IGNORECASE)
-        
-        if paragraphs:
-            # Clean each paragraph
-            clean_paragraphs = []
-            for p in paragraphs:
-                # Remove HTML tags from paragraph
-                clean_p = re.sub(r'<[^>]+>', '', p)
-                clean_p = re.sub(r'\s+', ' ', clean_p).strip()
-                
-                # Only keep substantial paragraphs
-                if len(clean_p) > 30 and not clean_p.lower().startswith(('cookie', 'advertisement', 'subscribe')):
-                    clean_paragraphs.append(clean_p)
-            
-            if clean_paragraphs:
-                return '\n\n'.join(clean_paragraphs[:15]), f"📰 Source: {url}"
-        
-        # Fallback: remove all HTML tags
-        text = re.sub(r'<[^>]+>', '', html)
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
-        
-        # Split into sentences and take meaningful ones
-        sentences = re.split(r'[.!?]+', text)
-        good_sentences = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if 20 < len(sentence) < 500:  # Reasonable sentence length
-                good_sentences.append(sentence)
-        
-        if good_sentences:
-            content = '. '.join(good_sentences[:25]) + '.'
-            return content, f"📰 Source: {url}"
-        else:
-            return text[:2000] if text else None, f"📰 Source: {url}"
-            
-    except Exception as e:
-        return None, f"❌ URL extraction failed: {str(e)}"
+from summarizer import (
+    BS4_AVAILABLE,
+    DOCX_AVAILABLE,
+    NEWSPAPER_AVAILABLE,
+    PRESETS,
+    PYPDF2_AVAILABLE,
+    ai_flight,
+    content_hash,
+    extract_url_content,
+    extraction_cache,
+    get_backend,
+    hf_breaker,
+    iter_preset_summaries,
+    iter_smart_summary,
+    process_uploaded_file,
+    summary_cache,
+    url_flight,
+)
 
 # Page configuration
 st.set_page_config(
@@ -208,26 +78,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Hugging Face API Configuration
-HF_API_URL = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-
-def query_huggingface_api(payload, api_key=None):
-    """Query Hugging Face Inference API"""
-    headers = {}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-    
-    try:
-        response = requests.post(HF_API_URL, headers=headers, json=payload, timeout=30)
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 503:
-            return {"error": "Model loading, please wait..."}
-        else:
-            return {"error": f"API Error: {response.status_code}"}
-    except Exception as e:
-        return {"error": f"Connection error: {str(e)}"}
-
 # Initialize session state
 if 'hf_api_key' not in st.session_state:
     st.session_state.hf_api_key = ""
@@ -255,254 +105,6 @@ def show_dependency_status():
     
     return status_text
 
-# Define preset configurations
-PRESETS = {
-    "tweet": {
-        "name": "📱 Tweet/Social",
-        "description": "Perfect for social media posts",
-        "sentences": 2,
-        "target_words": 45,
-        "max_words": 55
-    },
-    "quick": {
-        "name": "📄 Quick Summary", 
-        "description": "Brief overview of key points",
-        "sentences": 5,
-        "target_words": 75,
-        "max_words": 90
-    },
-    "executive": {
-        "name": "📊 Executive Brief",
-        "description": "Professional summary for business",
-        "sentences": 7,
-        "target_words": 110,
-        "max_words": 130
-    },
-    "detailed": {
-        "name": "📚 Detailed Summary",
-        "description": "Comprehensive overview",
-        "sentences": 10,
-        "target_words": 170,
-        "max_words": 200
-    }
-}
-
-def clean_and_split_sentences(text):
-    """Clean text and split into proper sentences"""
-    text = re.sub(r'\s+', ' ', text.strip())
-    raw_sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
-    
-    sentences = []
-    for sentence in raw_sentences:
-        sentence = sentence.strip()
-        if len(sentence) >= 10 and not sentence.endswith('..'):
-            if not sentence.endswith(('.', '!', '?')):
-                sentence += '.'
-            sentences.append(sentence)
-    
-    return sentences
-
-def smart_paraphrase(text):
-    """Enhanced paraphrasing with comprehensive replacements"""
-    replacements = {
-        # News & reporting
-        'reportedly': 'allegedly', 'infiltrated': 'breached', 'obtained': 'secured',
-        'suspended': 'halted', 'authorities': 'officials', 'considering': 'contemplating',
-        'individuals': 'people', 'conducted': 'carried out', 'mentioned': 'stated',
-        'operational': 'functional', 'approximately': 'about', 'subsequently': 'later',
-        
-        # Sports terms
-        'smashed': 'hit', 'crushing': 'defeating', 'sealed': 'secured', 'unassailable': 'commanding',
-        'deliveries': 'balls', 'holed out': 'was caught', 'removed cheaply': 'dismissed for low scores',
-        
-        # General terms
-        'server': 'system', 'technical advice': 'technical assistance', 'restart': 'restore',
-        'come to a standstill': 'been suspended', 'no response has been received': 'they have not received a response',
-        'have not been able to': 'cannot', 'As a result': 'Consequently', 'Even after': 'Despite',
-        
-        # Organization names
-        'Rajdhani Unnayan Kartripakkha': 'Rajuk', 'Electronic Construction Permitting System': 'ECPS',
-        'Bangladesh Computer Council': 'BCC', 'West Indies': 'Windies',
-        
-        # Time and process
-        'From the following day': 'The next day', 'all types of services': 'all services',
-        'are currently being provided': 'are available', 'linked to the incident': 'connected to the breach'
-    }
-    
-    result = text
-    for old, new in replacements.items():
-        result = result.replace(old, new)
-    
-    return result
-
-def create_basic_summary(text, target_sentences, target_words):
-    """Create a basic summary when AI is not available"""
-    sentences = clean_and_split_sentences(text)
-    
-    if len(sentences) <= target_sentences:
-        selected_sentences = sentences
-    else:
-        # Select sentences from beginning, middle, and end
-        if target_sentences >= 3:
-            # Take first sentence, some from middle, and last sentence
-            selected_sentences = [sentences[0]]
-            
-            if target_sentences > 2:
-                middle_count = target_sentences - 2
-                middle_start = len(sentences) // 3
-                middle_end = (2 * len(sentences)) // 3
-                middle_sentences = sentences[middle_start:middle_end]
-                
-                if len(middle_sentences) >= middle_count:
-                    step = len(middle_sentences) // middle_count
-                    selected_middle = [middle_sentences[i] for i in range(0, len(middle_sentences), step)][:middle_count]
-                else:
-                    selected_middle = middle_sentences
-                
-                selected_sentences.extend(selected_middle)
-            
-            if len(sentences) > 1:
-                selected_sentences.append(sentences[-1])
-        else:
-            selected_sentences = sentences[:target_sentences]
-    
-    # Apply paraphrasing
-    final_sentences = [smart_paraphrase(sentence) for sentence in selected_sentences]
-    
-    result = ' '.join(final_sentences)
-    word_count = len(result.split())
-    sentence_count = len(final_sentences)
-    
-    return result, sentence_count, word_count
-
-def create_ai_summary(text, target_sentences, target_words, api_key=None):
-    """Create AI-powered summary using Hugging Face API"""
-    try:
-        # Prepare the payload
-        max_length = max(target_words + 20, target_sentences * 15)
-        min_length = max(target_words - 10, target_sentences * 10, 20)
-        
-        payload = {
-            "inputs": text,
-            "parameters": {
-                "max_length": min(max_length, 500),  # API has limits
-                "min_length": min_length,
-                "do_sample": False
-            }
-        }
-        
-        # Query the API
-        result = query_huggingface_api(payload, api_key)
-        
-        if "error" in result:
-            return f"AI Error: {result['error']}", 0, 0
-        
-        if not result or not isinstance(result, list) or not result[0]:
-            return "AI Error: Invalid response from API", 0, 0
-            
-        summary_text = result[0].get('summary_text', '')
-        
-        if not summary_text:
-            return "AI Error: No summary generated", 0, 0
-        
-        # Clean and split sentences
-        sentences = clean_and_split_sentences(summary_text)
-        
-        # Adjust based on target
-        if len(sentences) > target_sentences:
-            selected_sentences = sentences[:target_sentences]
-        else:
-            selected_sentences = sentences
-        
-        # Apply paraphrasing
-        final_sentences = [smart_paraphrase(sentence) for sentence in selected_sentences]
-        
-        result_text = ' '.join(final_sentences)
-        word_count = len(result_text.split())
-        sentence_count = len(final_sentences)
-        
-        return result_text, sentence_count, word_count
-        
-    except Exception as e:
-        return f"AI Error: {str(e)}", 0, 0
-
-def create_smart_summary(text, target_sentences, target_words, priority="sentences", use_ai=True):
-    """Create summary using available methods"""
-    if use_ai:
-        result = create_ai_summary(text, target_sentences, target_words, st.session_state.hf_api_key)
-        if not result[0].startswith("AI Error"):
-            return result
-    
-    # Fallback to basic summary
-    return create_basic_summary(text, target_sentences, target_words)
-
-def process_uploaded_file(uploaded_file):
-    """Handle file uploads with enhanced support"""
-    try:
-        if uploaded_file.type == "application/pdf":
-            if PYPDF2_AVAILABLE:
-                # Use PyPDF2 if available
-                pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                content = ""
-                for page in pdf_reader.pages:
-                    content += page.extract_text() + "\n"
-                return content, f"📄 Source: {uploaded_file.name}"
-            else:
-                return None, "❌ PDF processing requires PyPDF2. Please try a text file or paste the content directly."
-        
-        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            if DOCX_AVAILABLE:
-                # Handle .docx files
-                doc = Document(uploaded_file)
-                content = ""
-                for paragraph in doc.paragraphs:
-                    content += paragraph.text + "\n"
-                return content, f"📄 Source: {uploaded_file.name}"
-            else:
-                return None, "❌ DOCX processing requires python-docx. Please try a text file."
-        
-        else:
-            # Handle text files and other formats
-            try:
-                content = str(uploaded_file.read(), "utf-8")
-                return content, f"📝 Source: {uploaded_file.name}"
-            except UnicodeDecodeError:
-                # Try different encodings
-                uploaded_file.seek(0)
-                try:
-                    content = str(uploaded_file.read(), "latin-1")
-                    return content, f"📝 Source: {uploaded_file.name}"
-                except:
-                    uploaded_file.seek(0)
-                    try:
-                        content = str(uploaded_file.read(), "cp1252")
-                        return content, f"📝 Source: {uploaded_file.name}"
-                    except:
-                        return None, "❌ Could not decode file. Please try a UTF-8 encoded text file."
-    except Exception as e:
-        return None, f"❌ Error reading file: {str(e)}"
-
-def extract_url_content(url):
-    """Extract content from URL using best available method"""
-    if NEWSPAPER_AVAILABLE:
-        try:
-            article = Article(url)
-            article.download()
-            article.parse()
-            if article.text and len(article.text.strip()) > 100:
-                return article.text, f"📰 Source: {url} (Advanced extraction)"
-        except Exception as e:
-            pass  # Fall back to other methods
-    
-    # Try enhanced extraction with BeautifulSoup
-    if BS4_AVAILABLE:
-        result = extract_url_content_enhanced(url)
-        if result[0] and not result[1].startswith("❌"):
-            return result[0], f"📰 Source: {url} (Enhanced extraction)"
-    
-    # Fall back to basic extraction
-    return extract_url_content_basic(url)
-
 # Main App Header
 st.markdown("""
 <div class="main-header">
@@ -543,7 +145,13 @@ with st.expander("🔑 Optional: Hugging Face API Setup (for better AI performan
 
 # Show system status
 with st.expander("🔧 System Status", expanded=False):
-    ai_status = "✅ Available (Hugging Face API)"
+    backend = get_backend()
+    if backend.name != "huggingface":
+        ai_status = f"✅ Available ({backend.label}: {backend.model_id})"
+    elif hf_breaker.state == "closed":
+        ai_status = "✅ Available (Hugging Face API)"
+    else:
+        ai_status = "⚠️ Temporarily unavailable (using basic processing until the API recovers)"
     
     if NEWSPAPER_AVAILABLE:
         url_status = "✅ Available (Advanced - newspaper3k)"
@@ -562,12 +170,19 @@ with st.expander("🔧 System Status", expanded=False):
     else:
         pdf_status = "⚠️ Limited (Text files only)"
     
+    cache_stats = summary_cache.stats()
+    extraction_stats = extraction_cache.stats()
+    shared_calls = ai_flight.stats()["shared"] + url_flight.stats()["shared"]
+    
     st.markdown(f"""
     **📊 Feature Status:**
     
     - **AI Summarization:** {ai_status}
     - **URL Extraction:** {url_status}
     - **File Processing:** {pdf_status}
+    - **Summary Cache:** {cache_stats['entries']} entries, {cache_stats['hits']} hits / {cache_stats['misses']} misses
+    - **Extraction Cache:** {extraction_stats['entries']} entries, {extraction_stats['bytes'] // 1024} KB
+    - **Shared Requests:** {shared_calls} identical fetches/AI calls served by one already in flight
     
     **💡 Note:** All core features work! Some advanced features may have limitations without additional packages.
     """)
@@ -722,7 +337,15 @@ with col1:
 with col2:
     st.header("📤 Output")
     
-    if generate_summary and content:
+    # Simple Mode computes every preset at once, so switching presets afterwards needs no new click
+    preset_key = content_hash(content, use_ai) if content else None
+    stored_presets = st.session_state.get("preset_summaries")
+    show_stored = (
+        mode == "Simple Mode" and not generate_summary
+        and stored_presets is not None and stored_presets["key"] == preset_key
+    )
+    
+    if (generate_summary or show_stored) and content:
         if len(content.strip()) < 30:
             st.error("❌ Content too short for summarization")
         else:
@@ -737,15 +360,64 @@ with col2:
                 target_sentences = custom_sentences
                 target_words = custom_words
                 summary_priority = priority.lower().split()[0]
+                mmr_lambda = None
                 mode_info = f"Custom: {target_sentences} sentences, {target_words} words"
             
-            # Generate summary with progress indicator
-            with st.spinner("Creating your professional summary..."):
+            # Generate summary, showing an extractive draft while the AI works
+            used_ai = use_ai
+            if mode == "Simple Mode":
+                if not show_stored:
+                    draft_box = st.empty()
+                    progress_box = st.empty()
+                    chunks_done = 0
+                    start_time = datetime.now()
+                    with st.spinner("Creating your professional summary..."):
+                        for event in iter_preset_summaries(
+                            content, preset_choice, use_ai=use_ai, api_key=st.session_state.hf_api_key
+                        ):
+                            if event["stage"] == "draft":
+                                draft_box.info(f"📝 **Quick draft** while the AI summary is prepared:\n\n{event['summary']}")
+                            elif event["stage"] == "chunk":
+                                chunks_done += 1
+                                progress_box.caption(
+                                    f"🧩 Condensed part {chunks_done} of {event['total']} "
+                                    f"(pass {event['pass']}): {event['summary']}"
+                                )
+                    end_time = datetime.now()
+                    draft_box.empty()
+                    progress_box.empty()
+                    stored_presets = {
+                        "key": preset_key,
+                        "results": event["results"],
+                        "processing_time": (end_time - start_time).total_seconds(),
+                    }
+                    st.session_state.preset_summaries = stored_presets
+                summary, final_sentences, final_words, method = stored_presets["results"][preset_choice]
+                used_ai = method == "ai"
+                processing_time = stored_presets["processing_time"]
+            else:
+                draft_box = st.empty()
+                progress_box = st.empty()
+                chunks_done = 0
                 start_time = datetime.now()
-                summary, final_sentences, final_words = create_smart_summary(
-                    content, target_sentences, target_words, summary_priority, use_ai
-                )
+                with st.spinner("Creating your professional summary..."):
+                    for event in iter_smart_summary(
+                        content, target_sentences, target_words, summary_priority, use_ai,
+                        api_key=st.session_state.hf_api_key, mmr_lambda=mmr_lambda
+                    ):
+                        if event["stage"] == "draft":
+                            draft_box.info(f"📝 **Quick draft** while the AI summary is prepared:\n\n{event['summary']}")
+                        elif event["stage"] == "chunk":
+                            chunks_done += 1
+                            progress_box.caption(
+                                f"🧩 Condensed part {chunks_done} of {event['total']} "
+                                f"(pass {event['pass']}): {event['summary']}"
+                            )
                 end_time = datetime.now()
+                draft_box.empty()
+                progress_box.empty()
+                summary, final_sentences, final_words = event["summary"], event["sentences"], event["words"]
+                used_ai = event["method"] == "ai"
                 processing_time = (end_time - start_time).total_seconds()
             
             if summary.startswith("Error") or summary.startswith("AI Error"):
@@ -770,7 +442,7 @@ with col2:
                 sentence_match = "✅ Perfect" if final_sentences == target_sentences else f"📊 {final_sentences}/{target_sentences}"
                 word_match = "✅ Perfect" if abs(final_words - target_words) <= 10 else f"📊 {final_words}/{target_words}"
                 
-                method_used = "AI-Powered (Hugging Face)" if use_ai and not summary.startswith("AI Error") else "Basic Text Processing"
+                method_used = f"AI-Powered ({get_backend().label})" if used_ai and not summary.startswith("AI Error") else "Basic Text Processing"
                 
                 st.subheader("📊 Summary Statistics")
                 stats_text = f"""**📋 Mode:** {mode_info}
@@ -865,7 +537,7 @@ with tab2:
     
     **Basic Text Processing:**
     - Fast, reliable fallback method
-    - Selects sentences from different parts of text
+    - Ranks sentences by importance (TextRank) and keeps the best ones
     - Always available, no dependencies
     - Good for when AI is unavailable
     
@@ -0,0 +1,63 @@
+"""Batch throughput of the command line's thread pool vs. process pool.
+
+Writes --docs synthetic text files to a temporary directory and summarizes
+them extractively (no network) with each pool size, so the numbers show how
+far CPU-bound work scales across cores.
+
+    python benchmarks/bench_batch.py --docs 400 --words 3000 --workers 1,2,4,8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ranking import synthetic_article  # noqa: E402
+from summarizer.cli import iter_directory, run_batch  # noqa: E402
+from summarizer.extractors import extraction_cache  # noqa: E402
+from summarizer.summarizers import summary_cache  # noqa: E402
+
+
+def write_corpus(directory, docs, words):
+    for i in range(docs):
+        with open(os.path.join(directory, f"doc{i:05d}.txt"), "w", encoding="utf-8") as f:
+            f.write(synthetic_article(words, seed=i))
+
+
+def timed_run(directory, workers, processes):
+    output = os.path.join(directory, "out.jsonl")
+    # Every run starts cold; forked workers inherit the parent's (now empty) caches
+    summary_cache.clear()
+    extraction_cache.clear()
+    items = ((item_id, path, False) for item_id, path in iter_directory(directory))
+    started = time.perf_counter()
+    counts = run_batch(items, output, workers=workers, resume=False, processes=processes,
+                       target_sentences=5, target_words=75, use_ai=False)
+    elapsed = time.perf_counter() - started
+    os.remove(output)
+    return counts["written"] / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=400)
+    parser.add_argument("--words", type=int, default=3000)
+    parser.add_argument("--workers", default=",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= (os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_corpus(directory, args.docs, args.words)
+        print(f"{args.docs} docs x {args.words} words, {os.cpu_count()} cores")
+        print(f"{'workers':>7} {'threads docs/s':>15} {'processes docs/s':>17} {'speedup':>8}")
+        baseline = None
+        for workers in (int(w) for w in args.workers.split(",")):
+            threads = timed_run(directory, workers, processes=False)
+            processes = timed_run(directory, workers, processes=True)
+            baseline = baseline or processes
+            print(f"{workers:>7} {threads:>15.1f} {processes:>17.1f} {processes / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
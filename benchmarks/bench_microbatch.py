@@ -0,0 +1,85 @@
+"""Throughput vs. latency of the local-model micro-batcher.
+
+By default the model is simulated: a forward pass costs a fixed overhead
+plus a smaller per-item cost, which is how a vectorized CPU model behaves.
+Pass --real to time the actual LocalModelBackend (needs transformers).
+
+    python benchmarks/bench_microbatch.py --clients 16 --requests 64
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarizer.backends import LocalModelBackend  # noqa: E402
+from summarizer.batching import MicroBatcher  # noqa: E402
+
+SAMPLE = (
+    "Middle order batter Tim David smashed the fastest Twenty20 International century for Australia "
+    "as they sealed a six-wicket victory over the West Indies in the third T20 on Friday. "
+) * 8
+
+
+def simulated_model(overhead, per_item):
+    def run_batch(texts, max_length, min_length):
+        time.sleep(overhead + per_item * len(texts))
+        return [(text[:max_length], None) for text in texts]
+    return run_batch
+
+
+def run(summarize, clients, requests_count):
+    latencies = []
+
+    def one(_):
+        started = time.perf_counter()
+        summarize([SAMPLE], 60, 20)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "throughput": requests_count / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    parser.add_argument("--waits-ms", default="0,5,20")
+    parser.add_argument("--overhead-ms", type=float, default=40, help="simulated fixed cost per forward pass")
+    parser.add_argument("--per-item-ms", type=float, default=5, help="simulated extra cost per batched item")
+    parser.add_argument("--real", action="store_true", help="time the real local model instead")
+    args = parser.parse_args()
+
+    print(f"{'batch':>5} {'wait_ms':>7} {'req/s':>8} {'p50_ms':>8} {'p95_ms':>8} {'mean_batch':>10}")
+    for batch_size in (int(b) for b in args.batch_sizes.split(',')):
+        for wait_ms in (float(w) for w in args.waits_ms.split(',')):
+            if args.real:
+                backend = LocalModelBackend(max_batch_size=batch_size, max_wait=wait_ms / 1000)
+                backend.load()
+                batcher = backend.batcher
+            else:
+                batcher = MicroBatcher(
+                    simulated_model(args.overhead_ms / 1000, args.per_item_ms / 1000),
+                    max_batch_size=batch_size,
+                    max_wait=wait_ms / 1000,
+                )
+            result = run(batcher.summarize, args.clients, args.requests)
+            mean_batch = batcher.stats()["mean_batch_size"]
+            print(f"{batch_size:>5} {wait_ms:>7.0f} {result['throughput']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {mean_batch:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-sentence cost of smart_paraphrase vs. the old one-str.replace-per-rule loop.
+
+Also times both against a synthetic table of --rules phrases to show how
+each approach scales with the size of the rule set.
+
+    python benchmarks/bench_paraphrase.py --rules 2000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarizer.paraphrase import Paraphraser, default_rule_set  # noqa: E402
+
+PARAPHRASE_RULES = default_rule_set().rules
+
+SENTENCES = [
+    "Middle order batter Tim David smashed the fastest Twenty20 International century for Australia "
+    "as they sealed a six-wicket victory over the West Indies.",
+    "Hackers reportedly infiltrated the server of Rajdhani Unnayan Kartripakkha and authorities are "
+    "considering a restart of the Electronic Construction Permitting System.",
+    "The quarterly report was published on Monday and shows steady growth across every region.",
+]
+
+
+def legacy_paraphrase(rules):
+    """The original raw-substring str.replace loop, kept here for comparison"""
+    def paraphrase(text):
+        replacements = dict(rules)
+        result = text
+        for old, new in replacements.items():
+            result = result.replace(old, new)
+        return result
+    return paraphrase
+
+
+def synthetic_rules(count):
+    rng = random.Random(0)
+    rules = dict(PARAPHRASE_RULES)
+    while len(rules) < count:
+        phrase = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+        rules[phrase] = phrase.upper()
+    return rules
+
+
+def per_sentence_us(func, number):
+    seconds = min(timeit.repeat(lambda: [func(sentence) for sentence in SENTENCES], number=number, repeat=3))
+    return seconds / (number * len(SENTENCES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    parser.add_argument("--rules", type=int, default=2000, help="size of the synthetic rule table")
+    args = parser.parse_args()
+
+    for rules in (PARAPHRASE_RULES, synthetic_rules(args.rules)):
+        number = max(args.number * len(PARAPHRASE_RULES) // len(rules), 50)
+        legacy = per_sentence_us(legacy_paraphrase(rules), number)
+        compiled = per_sentence_us(Paraphraser(rules).rewrite, number)
+        print(f"{len(rules):>6} rules: legacy {legacy:8.2f} us/sentence, compiled {compiled:8.2f} us/sentence")
+
+
+if __name__ == "__main__":
+    main()
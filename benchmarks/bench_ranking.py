@@ -0,0 +1,71 @@
+"""Latency of create_basic_summary per ranking method on a synthetic article.
+
+    python benchmarks/bench_ranking.py --words 10000
+    python benchmarks/bench_ranking.py --words 300000 --zipf --repeat 3
+
+--zipf draws words from a Zipf-distributed vocabulary, so sentences share
+terms the way real prose does and similarity rows are dense; the uniform
+vocabulary leaves most sentence pairs with nothing in common.
+"""
+import argparse
+import itertools
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import summarizer.summarizers as summarizers  # noqa: E402
+
+
+def synthetic_article(words, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(3000)] + ["the", "and", "of", "to", "in"] * 300
+    sentences = []
+    total = 0
+    while total < words:
+        length = rng.randint(8, 30)
+        sentences.append(' '.join(rng.choice(vocabulary) for _ in range(length)).capitalize() + '.')
+        total += length
+    return ' '.join(sentences)
+
+
+def zipf_article(words, seed=0, vocabulary_size=20000, exponent=1.1):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(vocabulary_size)]
+    weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, vocabulary_size + 1)))
+    sentences = []
+    total = 0
+    while total < words:
+        length = rng.randint(8, 30)
+        sentences.append(' '.join(rng.choices(vocabulary, cum_weights=weights, k=length)).capitalize() + '.')
+        total += length
+    return ' '.join(sentences)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=10000)
+    parser.add_argument("--sentences", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--zipf", action="store_true", help="overlapping Zipf vocabulary instead of uniform")
+    args = parser.parse_args()
+
+    text = (zipf_article if args.zipf else synthetic_article)(args.words)
+    print(f"{len(text.split())} words")
+    for method in ("position", "tfidf", "textrank"):
+        summarizers.SUMMARY_RANKER = method
+        summarizers.create_basic_summary(text, args.sentences, 80)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            summarizers.create_basic_summary(text, args.sentences, 80)
+        elapsed = (time.perf_counter() - started) / args.repeat
+        print(f"  {method:>9}: {elapsed * 1000:7.2f} ms")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Sentence segmentation throughput on MB-scale inputs.
+
+Compares the original regex split (collapse the whole document, then split
+into strings) with split_sentence_spans (offsets only) and
+clean_and_split_sentences (offsets, then every sentence materialized).
+
+    python benchmarks/bench_segmenter.py --megabytes 1 5
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarizer.text import clean_and_split_sentences, split_sentence_spans  # noqa: E402
+
+PARAGRAPH = (
+    "Middle order batter Tim David smashed the fastest Twenty20 International century for Australia. "
+    "Dr. Smith of the U.S. team said the pitch was \"perfect for batting.\" "
+    "David hit 11 sixes and six fours to finish on 102 off 37 deliveries!  Was it the best innings "
+    "of the year?\nMany think so, e.g. the former captain.\n\n"
+)
+
+
+def legacy_split(text):
+    """The original implementation, kept here for comparison"""
+    text = re.sub(r'\s+', ' ', text.strip())
+    raw_sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+    sentences = []
+    for sentence in raw_sentences:
+        sentence = sentence.strip()
+        if len(sentence) >= 10 and not sentence.endswith('..'):
+            if not sentence.endswith(('.', '!', '?')):
+                sentence += '.'
+            sentences.append(sentence)
+    return sentences
+
+
+def timed(func, text):
+    started = time.perf_counter()
+    count = len(func(text))
+    return time.perf_counter() - started, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 5])
+    args = parser.parse_args()
+
+    for megabytes in args.megabytes:
+        text = PARAGRAPH * int(megabytes * 1024 * 1024 / len(PARAGRAPH))
+        print(f"{len(text) / 1e6:.1f} MB input")
+        for name, func in (
+            ("legacy split", legacy_split),
+            ("spans only", split_sentence_spans),
+            ("spans + strings", clean_and_split_sentences),
+        ):
+            seconds, count = timed(func, text)
+            print(f"  {name:>16}: {seconds * 1000:8.1f} ms  {len(text) / seconds / 1e6:6.1f} MB/s  {count} sentences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Core summarization library used by the Streamlit frontend in app.py.
+
+Nothing in this package imports Streamlit, so it can be used from workers,
+command-line tools and benchmarks.
+"""
+from .backends import (
+    BACKENDS,
+    TRANSFORMERS_AVAILABLE,
+    HuggingFaceBackend,
+    LocalModelBackend,
+    OpenAICompatibleBackend,
+    SummarizationBackend,
+    backend_stats,
+    get_backend,
+)
+from .batching import MicroBatcher
+from .cache import TTLCache, content_hash, normalize_text
+from .circuit import CircuitBreaker
+from .extractors import (
+    BS4_AVAILABLE,
+    DOCX_AVAILABLE,
+    NEWSPAPER_AVAILABLE,
+    PYPDF2_AVAILABLE,
+    UploadedBytes,
+    extract_url_content,
+    extract_url_content_basic,
+    extract_url_content_enhanced,
+    extraction_cache,
+    iter_uploaded_file_text,
+    process_uploaded_file,
+    upload_source_info,
+    url_flight,
+)
+from .http_pool import configure_host, connection_stats, get_session, http_get, http_post
+from .hf_client import (
+    HF_API_URL,
+    hf_breaker,
+    hf_client_stats,
+    hf_inference,
+    query_huggingface_api,
+    query_huggingface_api_batch,
+    request_summary_text,
+    request_summary_texts,
+)
+from .inference_client import InferenceClient
+from .jobs import PRIORITIES, JobQueue, QueueFull
+from .mapreduce import chunk_sentences, map_reduce_text
+from .presets import PRESETS
+from .ranking import (
+    RANKING_AVAILABLE,
+    mmr_order,
+    mmr_select,
+    mmr_within_budget,
+    rank_sentences,
+    sentence_term_matrix,
+    similarity_matrix,
+    similarity_row,
+    top_in_order,
+)
+from .selection import prefix_within_budget, select_within_budget
+from .singleflight import SingleFlight
+from .summarizers import (
+    RankedDocument,
+    ai_flight,
+    create_ai_summary,
+    create_basic_summary,
+    create_basic_summary_from_stream,
+    create_preset_summaries,
+    create_smart_summary,
+    iter_preset_summaries,
+    iter_smart_summary,
+    race_stats,
+    sample_evenly,
+    summary_cache,
+    summary_cache_key,
+    summarize_uploaded_file,
+)
+from .paraphrase import Paraphraser, RuleSet, default_rule_set, load_rule_files
+from .text import (
+    clean_and_split_sentences,
+    iter_sentences,
+    sentence_text,
+    smart_paraphrase,
+    split_sentence_spans,
+)
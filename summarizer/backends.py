@@ -0,0 +1,188 @@
+"""Summarization backends: hosted HF Inference API, OpenAI-compatible endpoints, in-process model"""
+import importlib.util
+import os
+import threading
+
+from .batching import MicroBatcher
+from .circuit import CircuitBreaker
+from .hf_client import HF_API_URL, HF_MAX_IN_FLIGHT, hf_client_stats, request_summary_texts
+from .inference_client import InferenceClient
+
+# Optional: the in-process backend needs transformers (and torch); it's only imported when used
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("transformers") is not None
+
+SUMMARY_BACKEND = os.environ.get("SUMMARY_BACKEND", "huggingface")
+
+
+class SummarizationBackend:
+    """Turns texts into abstractive summaries.
+
+    ``summarize`` takes a list of texts and returns one (summary_text, error)
+    pair per text, in order. ``model_id`` identifies the model in cache keys.
+    """
+
+    name = "base"
+    label = "AI"
+    model_id = ""
+
+    def summarize(self, texts, max_length, min_length, api_key=None, max_in_flight=HF_MAX_IN_FLIGHT):
+        raise NotImplementedError
+
+    def stats(self):
+        """Client counters for /health; None when the backend makes no remote calls"""
+        return None
+
+
+class HuggingFaceBackend(SummarizationBackend):
+    """Hosted Hugging Face Inference API (the default)"""
+
+    name = "huggingface"
+    label = "Hugging Face"
+
+    def __init__(self, api_url=None):
+        self.api_url = api_url or HF_API_URL
+        self.model_id = self.api_url
+
+    def summarize(self, texts, max_length, min_length, api_key=None, max_in_flight=HF_MAX_IN_FLIGHT):
+        return request_summary_texts(texts, max_length, min_length, api_key, self.api_url, max_in_flight)
+
+    def stats(self):
+        return hf_client_stats()
+
+
+class OpenAICompatibleBackend(SummarizationBackend):
+    """Any server speaking the OpenAI chat completions API (vLLM, TGI, llama.cpp, OpenAI)"""
+
+    name = "openai"
+    label = "OpenAI-compatible"
+
+    def __init__(self, base_url=None, model=None, api_key=None):
+        self.base_url = (base_url or os.environ.get("SUMMARY_OPENAI_URL", "http://localhost:8080")).rstrip('/')
+        self.model = model or os.environ.get("SUMMARY_OPENAI_MODEL", "tgi")
+        self.api_key = api_key or os.environ.get("SUMMARY_OPENAI_KEY")
+        self.model_id = f"{self.base_url}#{self.model}"
+        # Separate breaker so an outage here doesn't block the hosted HF path and vice versa
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get("HF_BREAKER_FAILURES", 5)),
+            latency_threshold=float(os.environ.get("HF_BREAKER_LATENCY", 20)),
+            reset_timeout=float(os.environ.get("HF_BREAKER_RESET", 30)),
+        )
+        # Its own client too: this server's traffic has its own in-flight cap, retry rules and counters
+        self.client = InferenceClient(
+            f"{self.base_url}/v1/chat/completions", self.breaker,
+            max_in_flight=int(os.environ.get("SUMMARY_OPENAI_MAX_IN_FLIGHT", 8)),
+            timeout=float(os.environ.get("SUMMARY_OPENAI_TIMEOUT", 60)),
+            name="openai-client",
+        )
+
+    def _payload(self, text, max_length, min_length):
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You summarize text faithfully in plain prose, without preamble."},
+                {"role": "user", "content": (
+                    f"Summarize the following text in {min_length} to {max_length} words:\n\n{text}"
+                )},
+            ],
+            "max_tokens": int(max_length * 1.5) + 16,
+            "temperature": 0,
+        }
+
+    def summarize(self, texts, max_length, min_length, api_key=None, max_in_flight=HF_MAX_IN_FLIGHT):
+        payloads = [self._payload(text, max_length, min_length) for text in texts]
+        results = self.client.query_batch(payloads, self.api_key, max_in_flight=max_in_flight)
+        summaries = []
+        for result in results:
+            if isinstance(result, dict) and "error" in result:
+                summaries.append((None, result["error"]))
+                continue
+            try:
+                summary_text = result["choices"][0]["message"]["content"].strip()
+            except (KeyError, IndexError, TypeError, AttributeError):
+                summaries.append((None, "Invalid response from API"))
+                continue
+            summaries.append((summary_text, None) if summary_text else (None, "No summary generated"))
+        return summaries
+
+    def stats(self):
+        return self.client.stats()
+
+
+class LocalModelBackend(SummarizationBackend):
+    """CPU model loaded once per process with transformers and shared by all sessions"""
+
+    name = "local"
+    label = "Local model"
+
+    def __init__(self, model_name=None, device=None, max_batch_size=None, max_wait=None):
+        self.model_name = model_name or os.environ.get("SUMMARY_LOCAL_MODEL", "sshleifer/distilbart-cnn-12-6")
+        self.device = int(os.environ.get("SUMMARY_LOCAL_DEVICE", -1)) if device is None else device
+        self.model_id = f"local:{self.model_name}"
+        self._pipeline = None
+        self._load_lock = threading.Lock()
+        # Concurrent sessions share forward passes instead of queuing one request at a time
+        self.batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=max_batch_size or int(os.environ.get("SUMMARY_BATCH_SIZE", 8)),
+            max_wait=max_wait if max_wait is not None else float(os.environ.get("SUMMARY_BATCH_WAIT_MS", 10)) / 1000,
+        )
+
+    def load(self):
+        """Load the model on first use; later calls return the same pipeline"""
+        if self._pipeline is None:
+            with self._load_lock:
+                if self._pipeline is None:
+                    from transformers import pipeline
+                    self._pipeline = pipeline("summarization", model=self.model_name, device=self.device)
+        return self._pipeline
+
+    def _run_batch(self, texts, max_length, min_length):
+        """One padded forward pass over ``texts``; called only from the batcher thread"""
+        try:
+            outputs = self.load()(
+                list(texts),
+                max_length=max_length,
+                min_length=min(min_length, max_length),
+                do_sample=False,
+                truncation=True,
+                batch_size=len(texts),
+            )
+        except Exception as e:
+            return [(None, f"Local model error: {str(e)}")] * len(texts)
+        return [
+            (output.get("summary_text", ""), None) if output.get("summary_text") else (None, "No summary generated")
+            for output in outputs
+        ]
+
+    def summarize(self, texts, max_length, min_length, api_key=None, max_in_flight=HF_MAX_IN_FLIGHT):
+        if not TRANSFORMERS_AVAILABLE:
+            return [(None, "Local model requires transformers. Run: pip install transformers torch")] * len(texts)
+        return self.batcher.summarize(texts, max_length, min_length)
+
+
+BACKENDS = {
+    HuggingFaceBackend.name: HuggingFaceBackend,
+    OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+    LocalModelBackend.name: LocalModelBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def backend_stats():
+    """Client counters of every backend instantiated so far, by name"""
+    with _instances_lock:
+        instances = dict(_instances)
+    return {name: backend.stats() for name, backend in instances.items()}
+
+
+def get_backend(name=None):
+    """Return the shared backend instance for ``name`` (default: SUMMARY_BACKEND)"""
+    name = name or SUMMARY_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summarization backend: {name!r} (choose from {', '.join(BACKENDS)})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
@@ -0,0 +1,95 @@
+"""Dynamic micro-batching in front of an in-process model"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collects concurrent summarize calls into batched forward passes.
+
+    ``run_batch(texts, max_length, min_length)`` must return one
+    (summary_text, error) pair per text. Requests wait at most ``max_wait``
+    seconds for company; a batch runs as soon as ``max_batch_size`` requests
+    are queued. Requests with different length limits run in separate passes,
+    and each pass is sorted by input length so padding stays small.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait=0.01):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, text, max_length, min_length):
+        """Queue one text and return a Future for its (summary_text, error) pair"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, max_length, min_length, future))
+        return future
+
+    def summarize(self, texts, max_length, min_length):
+        """Blocking helper: queue every text and wait for all results, in order"""
+        futures = [self.submit(text, max_length, min_length) for text in texts]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "queued": self._queue.qsize(),
+            }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+                    self._worker.start()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Anything already waiting rides along up to the batch limit
+        while len(pending) < self.max_batch_size:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+
+    def _loop(self):
+        while True:
+            pending = self._collect()
+            groups = {}
+            for item in pending:
+                groups.setdefault((item[1], item[2]), []).append(item)
+            for (max_length, min_length), items in groups.items():
+                items.sort(key=lambda item: len(item[0]), reverse=True)
+                self._run(items, max_length, min_length)
+
+    def _run(self, items, max_length, min_length):
+        try:
+            results = self.run_batch([item[0] for item in items], max_length, min_length)
+        except Exception as e:
+            results = [(None, f"Batch error: {str(e)}")] * len(items)
+        with self._stats_lock:
+            self.batches += 1
+            self.items += len(items)
+        for item, result in zip(items, results):
+            item[3].set_result(result)
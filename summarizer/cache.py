@@ -0,0 +1,168 @@
+"""In-process LRU/TTL caches with optional SQLite persistence"""
+import hashlib
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies of a text share a key"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def content_hash(*parts):
+    """Stable SHA-256 hex digest over text and parameter parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            data = part
+        else:
+            data = str(part).encode('utf-8')
+        # Length prefix keeps ("ab", "c") and ("a", "bc") apart
+        digest.update(str(len(data)).encode('ascii') + b':' + data)
+    return digest.hexdigest()
+
+
+def approx_size(value):
+    """Rough byte size of cached values (strings, bytes and tuples of them)"""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(approx_size(item) for item in value) + 8 * len(value)
+    if isinstance(value, dict):
+        return sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    return 8
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry expiry and size bounds.
+
+    When ``db_path`` is given, entries are also written to a SQLite file so a
+    restarted process starts warm. Values must be picklable in that case. The
+    file keeps only the newest ``max_entries`` rows and, with ``max_bytes``,
+    only as many pickled bytes.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600, max_bytes=None, db_path=None, sizeof=approx_size):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, expires_at REAL, value BLOB)"
+            )
+            self._trim_db()
+            self._db.commit()
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` or ``default`` on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[0] > now:
+                    value = pickle.loads(row[1])
+                    self._store(key, value, row[0])
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key``, evicting old entries as needed"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if not self._store(key, value, expires_at):
+                return
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, expires_at, pickle.dumps(value)),
+                )
+                self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+                self._trim_db()
+                self._db.commit()
+
+    def clear(self):
+        """Drop every entry, including the on-disk copy"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters and current size, for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key, value, expires_at):
+        size = self.sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False  # Never let a single entry flush the whole cache
+        self._entries[key] = (expires_at, size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def _trim_db(self):
+        """Hold the SQLite copy to the same bounds as memory, dropping the oldest writes first"""
+        # INSERT OR REPLACE gives a row a fresh rowid, so rowid order is write order
+        self._db.execute(
+            "DELETE FROM cache WHERE rowid NOT IN (SELECT rowid FROM cache ORDER BY rowid DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        if self.max_bytes is not None:
+            self._db.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM ("
+                "SELECT rowid, SUM(length(value)) OVER (ORDER BY rowid DESC) AS total FROM cache"
+                ") WHERE total > ?)",
+                (self.max_bytes,),
+            )
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,105 @@
+"""Circuit breaker for calls to an unreliable remote service"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a failing service and probes it again after a cool-down.
+
+    The breaker opens after ``failure_threshold`` consecutive failures, where a
+    success slower than ``latency_threshold`` seconds also counts as a failure.
+    While open, ``allow_request`` returns False. After ``reset_timeout``
+    seconds it goes half-open and lets ``half_open_probes`` requests through;
+    a probe success closes it again and a probe failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, latency_threshold=None, reset_timeout=30.0, half_open_probes=1):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow_request(self):
+        """True if a call may go out now; every allowed call must be followed by a record_* call"""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency=0.0):
+        """Report a completed call and how long it took"""
+        if self.latency_threshold is not None and latency > self.latency_threshold:
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            self._state = CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Report a failed call"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+                self._trip()
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._trip()
+
+    def record_ignored(self):
+        """Report a call whose outcome says nothing about the service's health"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def reset(self):
+        """Force the breaker closed"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probes_in_flight = 0
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._failures = 0
+        self.trips += 1
+
+    def _refresh(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
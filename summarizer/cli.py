@@ -0,0 +1,247 @@
+"""Command-line batch summarization of document directories and URL lists.
+
+    python -m summarizer docs/ -o summaries.jsonl --preset executive
+    python -m summarizer --urls urls.txt -o summaries.jsonl --workers 16
+    python -m summarizer docs/ -o summaries.jsonl --no-ai --processes --workers 8
+
+Each input becomes one JSON line with its summary and per-item timings.
+Re-running with the same output file skips inputs that already have a
+record, so an interrupted job picks up where it stopped; --retry-failed
+tries the failed ones again.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .extractors import FILE_TYPES, UploadedBytes, extract_url_content, process_uploaded_file, upload_source_info
+from .presets import PRESETS
+from .summarizers import create_smart_summary, summarize_uploaded_file
+
+CLI_WORKERS = int(os.environ.get("SUMMARY_CLI_WORKERS", 8))
+
+
+class LocalFile(UploadedBytes):
+    """A file on disk, read into an upload-like object for process_uploaded_file"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read(), os.path.basename(path))
+
+
+def iter_directory(root):
+    """(item_id, path) for every supported file under ``root``, in a stable order"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in FILE_TYPES:
+                path = os.path.join(directory, name)
+                yield os.path.relpath(path, root), path
+
+
+def iter_url_file(path):
+    """(url, url) for each non-blank, non-comment line of a URL list"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith("#"):
+                yield url, url
+
+
+def completed_ids(output_path, retry_failed=False):
+    """Ids that already have a record in ``output_path``; with ``retry_failed``, successful ones only"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    # A run killed mid-write can leave half a multi-byte character at the end
+    with open(output_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run; that item is redone
+                continue
+            if not retry_failed or "error" not in record:
+                done.add(record.get("id"))
+    return done
+
+
+def summarize_file_stream(path, target_sentences, target_words, priority="sentences", mmr_lambda=None):
+    """Extractive summary fields for a file on disk, its text read as a stream"""
+    upload = LocalFile(path)
+    fields = {"source": upload_source_info(upload)}
+    try:
+        summary, sentences, words, input_words = summarize_uploaded_file(
+            upload, target_sentences, target_words, priority, mmr_lambda
+        )
+    except ValueError as e:
+        fields["error"] = str(e)
+    else:
+        fields.update(summary=summary, sentences=sentences, words=words, input_words=input_words)
+    return fields
+
+
+def summarize_item(item_id, source, is_url, target_sentences, target_words, priority="sentences",
+                   use_ai=True, api_key=None, mmr_lambda=None, latency_budget=0):
+    """Extract and summarize one file path or URL; returns a JSON-ready record"""
+    record = {"id": item_id}
+    started = time.perf_counter()
+    try:
+        if not is_url and not use_ai:
+            # Extractive file summaries stream the text, so a huge file is never held decoded in full
+            record.update(summarize_file_stream(source, target_sentences, target_words, priority, mmr_lambda))
+            record["total_ms"] = record["summarize_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return record
+        if is_url:
+            content, source_info = extract_url_content(source)
+        else:
+            content, source_info = process_uploaded_file(LocalFile(source))
+        extracted = time.perf_counter()
+        record["source"] = source_info
+        record["extract_ms"] = round((extracted - started) * 1000, 1)
+
+        if content is None:
+            record["error"] = source_info
+        elif len(content.strip()) < 30:
+            record["error"] = "❌ Content too short for summarization"
+        else:
+            summary, sentences, words = create_smart_summary(
+                content, target_sentences, target_words, priority, use_ai,
+                api_key=api_key, mmr_lambda=mmr_lambda, latency_budget=latency_budget
+            )
+            record["summarize_ms"] = round((time.perf_counter() - extracted) * 1000, 1)
+            if summary.startswith("Error") or summary.startswith("AI Error"):
+                record["error"] = summary
+            else:
+                record.update(
+                    summary=summary, sentences=sentences, words=words, input_words=len(content.split())
+                )
+    except Exception as e:
+        record["error"] = f"❌ {type(e).__name__}: {e}"
+    record["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def _open_for_append(output_path):
+    # Start on a fresh line if the previous run died mid-write; the last byte is checked
+    # in binary, since the cut may fall inside a multi-byte character
+    cut_short = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            cut_short = f.read(1) != b"\n"
+    output = open(output_path, "a", encoding="utf-8")
+    if cut_short:
+        output.write("\n")
+    return output
+
+
+def run_batch(items, output_path, workers=CLI_WORKERS, resume=True, progress=None, processes=False,
+              retry_failed=False, **summary_options):
+    """Summarize ``items`` ((item_id, source, is_url) triples) into a JSONL file.
+
+    Work is fed to the pool a few items at a time, so memory stays flat
+    however long the input is, and records are written in input order as
+    soon as every earlier item has finished. With ``processes`` the items run
+    in a process pool instead of threads; only the id and path or URL cross
+    the process boundary, and each worker reads and parses its own input, so
+    CPU-bound extraction and ranking use every core. On resume, items that
+    already have a record are skipped, failed ones too unless
+    ``retry_failed``. Returns counts of written, failed and skipped items.
+    """
+    done = completed_ids(output_path, retry_failed) if resume else set()
+    counts = {"written": 0, "failed": 0, "skipped": 0}
+    window = max(workers, 1) * 4
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+
+    mode_open = _open_for_append if resume else (lambda path: open(path, "w", encoding="utf-8"))
+    with mode_open(output_path) as output, executor_class(max_workers=workers) as pool:
+        pending = deque()
+
+        def write_next():
+            record = pending.popleft().result()
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            counts["failed" if "error" in record else "written"] += 1
+            if progress:
+                progress(record, counts)
+
+        for item_id, source, is_url in items:
+            if item_id in done:
+                counts["skipped"] += 1
+                continue
+            pending.append(pool.submit(summarize_item, item_id, source, is_url, **summary_options))
+            while pending and (len(pending) >= window or pending[0].done()):
+                write_next()
+        while pending:
+            write_next()
+    return counts
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m summarizer", description=__doc__.splitlines()[0],
+    )
+    parser.add_argument("directory", nargs="?", help="directory of .txt/.md/.pdf/.docx files (searched recursively)")
+    parser.add_argument("--urls", help="file with one URL per line, instead of a directory")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append results to")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--sentences", type=int, help="target sentences (overrides the preset)")
+    parser.add_argument("--words", type=int, help="target words (overrides the preset)")
+    parser.add_argument("--priority", choices=("sentences", "words"), default="sentences")
+    parser.add_argument("--no-ai", action="store_true", help="use extractive summarization only")
+    parser.add_argument("--latency-budget", type=float, default=0,
+                        help="seconds to wait for the AI summary before using the extractive one")
+    parser.add_argument("--api-key", default=os.environ.get("HF_API_KEY"), help="defaults to $HF_API_KEY")
+    parser.add_argument("--workers", type=int,
+                        help=f"pool size (default {CLI_WORKERS} threads, or one process per core)")
+    parser.add_argument("--processes", action="store_true",
+                        help="run workers as processes; faster for CPU-bound --no-ai jobs on several cores")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output instead of skipping done items")
+    parser.add_argument("--retry-failed", action="store_true", help="on resume, redo items whose last run failed")
+    parser.add_argument("--quiet", action="store_true", help="don't print per-item progress")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if bool(args.directory) == bool(args.urls):
+        parser.error("give either a directory or --urls, not both")
+
+    if args.urls:
+        items = ((item_id, url, True) for item_id, url in iter_url_file(args.urls))
+    else:
+        if not os.path.isdir(args.directory):
+            parser.error(f"not a directory: {args.directory}")
+        items = ((item_id, path, False) for item_id, path in iter_directory(args.directory))
+
+    preset = PRESETS[args.preset]
+    workers = args.workers or (os.cpu_count() if args.processes else CLI_WORKERS)
+
+    def progress(record, counts):
+        if not args.quiet:
+            status = record.get("error") or f"{record['words']} words"
+            print(f"[{counts['written'] + counts['failed']}] {record['id']}: {status} "
+                  f"({record['total_ms']:.0f} ms)", file=sys.stderr)
+
+    started = time.perf_counter()
+    counts = run_batch(
+        items, args.output, workers=workers, resume=not args.no_resume, progress=progress,
+        processes=args.processes, retry_failed=args.retry_failed,
+        target_sentences=args.sentences or preset["sentences"],
+        target_words=args.words or preset["target_words"],
+        priority=args.priority,
+        use_ai=not args.no_ai,
+        api_key=args.api_key,
+        mmr_lambda=None if args.sentences or args.words else preset["mmr_lambda"],
+        latency_budget=args.latency_budget,
+    )
+    elapsed = time.perf_counter() - started
+    processed = counts["written"] + counts["failed"]
+    print(f"{counts['written']} summarized, {counts['failed']} failed, {counts['skipped']} skipped "
+          f"in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.1f} items/s)", file=sys.stderr)
+    return 1 if counts["failed"] and not counts["written"] else 0
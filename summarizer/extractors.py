@@ -0,0 +1,344 @@
+"""Content extraction from URLs and uploaded files"""
+import codecs
+import io
+import os
+import re
+
+from .cache import TTLCache, content_hash
+from .http_pool import http_get
+from .singleflight import SingleFlight
+
+# Try to import optional dependencies with fallbacks
+try:
+    from newspaper import Article
+    NEWSPAPER_AVAILABLE = True
+except ImportError:
+    NEWSPAPER_AVAILABLE = False
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+try:
+    from docx import Document
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+# Extraction results are memoized process-wide so Streamlit reruns don't re-fetch or re-parse
+URL_CACHE_TTL = float(os.environ.get("URL_CACHE_TTL", 15 * 60))
+FILE_CACHE_TTL = float(os.environ.get("FILE_CACHE_TTL", 60 * 60))
+extraction_cache = TTLCache(
+    max_entries=int(os.environ.get("EXTRACTION_CACHE_SIZE", 256)),
+    max_bytes=int(os.environ.get("EXTRACTION_CACHE_BYTES", 64 * 1024 * 1024)),
+)
+
+# Sessions submitting the same URL at once (a viral article, say) share one fetch
+url_flight = SingleFlight()
+
+# Enhanced URL content extraction
+def extract_url_content_enhanced(url):
+    """Extract content from URL using BeautifulSoup for better results"""
+    try:
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        }
+        
+        response = http_get(url, timeout=15, headers=headers)
+        response.raise_for_status()
+        
+        if BS4_AVAILABLE:
+            soup = BeautifulSoup(response.content, 'html.parser')
+            
+            # Remove unwanted elements
+            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'aside', 'advertisement']):
+                element.decompose()
+            
+            # Try to find main content areas
+            content_areas = (
+                soup.find('article') or 
+                soup.find('main') or 
+                soup.find('div', class_=re.compile(r'content|article|post|story', re.I)) or
+                soup.find('div', id=re.compile(r'content|article|post|story', re.I))
+            )
+            
+            if content_areas:
+                # Extract text from paragraphs within content area
+                paragraphs = content_areas.find_all(['p', 'div'], string=True)
+                content_text = []
+                
+                for p in paragraphs:
+                    text = p.get_text().strip()
+                    if len(text) > 50:  # Only meaningful paragraphs
+                        content_text.append(text)
+                
+                if content_text:
+                    result = '\n\n'.join(content_text[:15])  # First 15 paragraphs
+                else:
+                    # Fallback to all paragraphs
+                    all_paragraphs = soup.find_all('p')
+                    content_text = [p.get_text().strip() for p in all_paragraphs if len(p.get_text().strip()) > 30]
+                    result = '\n\n'.join(content_text[:20])
+            else:
+                # Fallback to all text
+                result = soup.get_text()
+                # Clean up excessive whitespace
+                result = re.sub(r'\n\s*\n', '\n\n', result)
+                result = re.sub(r' +', ' ', result)
+            
+            return result.strip(), f"📰 Source: {url}"
+        else:
+            # Fallback to basic extraction
+            return extract_url_content_basic(url)
+            
+    except Exception as e:
+        return None, f"❌ Enhanced URL extraction failed: {str(e)}"
+
+# Basic URL content extraction without beautifulsoup
+def extract_url_content_basic(url):
+    """Extract content from URL using basic requests and regex"""
+    try:
+        response = http_get(url, timeout=10, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        response.raise_for_status()
+        
+        html = response.text
+        
+        # Remove script and style tags
+        html = re.sub(r'<script.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = re.sub(r'<style.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = re.sub(r'<nav.*?</nav>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = re.sub(r'<header.*?</header>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = re.sub(r'<footer.*?</footer>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        
+        # Extract text from paragraphs specifically
+        paragraphs = re.findall(r'<p[^>]*>(.*?)</p>', html, re.DOTALL | re.IGNORECASE)
+        
+        if paragraphs:
+            # Clean each paragraph
+            clean_paragraphs = []
+            for p in paragraphs:
+                # Remove HTML tags from paragraph
+                clean_p = re.sub(r'<[^>]+>', '', p)
+                clean_p = re.sub(r'\s+', ' ', clean_p).strip()
+                
+                # Only keep substantial paragraphs
+                if len(clean_p) > 30 and not clean_p.lower().startswith(('cookie', 'advertisement', 'subscribe')):
+                    clean_paragraphs.append(clean_p)
+            
+            if clean_paragraphs:
+                return '\n\n'.join(clean_paragraphs[:15]), f"📰 Source: {url}"
+        
+        # Fallback: remove all HTML tags
+        text = re.sub(r'<[^>]+>', '', html)
+        text = re.sub(r'\s+', ' ', text)
+        text = text.strip()
+        
+        # Split into sentences and take meaningful ones
+        sentences = re.split(r'[.!?]+', text)
+        good_sentences = []
+        
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if 20 < len(sentence) < 500:  # Reasonable sentence length
+                good_sentences.append(sentence)
+        
+        if good_sentences:
+            content = '. '.join(good_sentences[:25]) + '.'
+            return content, f"📰 Source: {url}"
+        else:
+            return text[:2000] if text else None, f"📰 Source: {url}"
+            
+    except Exception as e:
+        return None, f"❌ URL extraction failed: {str(e)}"
+
+def _process_uploaded_file(uploaded_file):
+    """Handle file uploads with enhanced support"""
+    try:
+        if uploaded_file.type == "application/pdf":
+            if PYPDF2_AVAILABLE:
+                # Use PyPDF2 if available
+                pdf_reader = PyPDF2.PdfReader(uploaded_file)
+                content = ""
+                for page in pdf_reader.pages:
+                    content += page.extract_text() + "\n"
+                return content, f"📄 Source: {uploaded_file.name}"
+            else:
+                return None, "❌ PDF processing requires PyPDF2. Please try a text file or paste the content directly."
+        
+        elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            if DOCX_AVAILABLE:
+                # Handle .docx files
+                doc = Document(uploaded_file)
+                content = ""
+                for paragraph in doc.paragraphs:
+                    content += paragraph.text + "\n"
+                return content, f"📄 Source: {uploaded_file.name}"
+            else:
+                return None, "❌ DOCX processing requires python-docx. Please try a text file."
+        
+        else:
+            # Handle text files and other formats
+            try:
+                content = str(uploaded_file.read(), "utf-8")
+                return content, f"📝 Source: {uploaded_file.name}"
+            except UnicodeDecodeError:
+                # Try different encodings
+                uploaded_file.seek(0)
+                try:
+                    content = str(uploaded_file.read(), "latin-1")
+                    return content, f"📝 Source: {uploaded_file.name}"
+                except:
+                    uploaded_file.seek(0)
+                    try:
+                        content = str(uploaded_file.read(), "cp1252")
+                        return content, f"📝 Source: {uploaded_file.name}"
+                    except:
+                        return None, "❌ Could not decode file. Please try a UTF-8 encoded text file."
+    except Exception as e:
+        return None, f"❌ Error reading file: {str(e)}"
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+FILE_TYPES = {
+    ".txt": "text/plain",
+    ".md": "text/markdown",
+    ".pdf": PDF_TYPE,
+    ".docx": DOCX_TYPE,
+}
+
+class UploadedBytes(io.BytesIO):
+    """File contents in memory with the name/type attributes of a Streamlit upload"""
+    
+    def __init__(self, data, name, type=None):
+        super().__init__(data)
+        self.name = name
+        self.type = type or FILE_TYPES.get(os.path.splitext(name)[1].lower(), "text/plain")
+
+def upload_source_info(uploaded_file):
+    """The source line process_uploaded_file reports for an upload"""
+    icon = "📄" if uploaded_file.type in (PDF_TYPE, DOCX_TYPE) else "📝"
+    return f"{icon} Source: {uploaded_file.name}"
+
+def iter_uploaded_file_text(uploaded_file, block_size=64 * 1024):
+    """Yield an upload's text piece by piece: per PDF page, per DOCX paragraph, per text block.
+
+    Feed the pieces to text.iter_sentences to start scoring before the whole
+    file is read. Text files are decoded as UTF-8; a file that isn't UTF-8 in
+    its first block is read as latin-1 instead, and invalid bytes found later
+    are replaced. Raises RuntimeError when the format needs a missing package.
+    """
+    if uploaded_file.type == PDF_TYPE:
+        if not PYPDF2_AVAILABLE:
+            raise RuntimeError("PDF processing requires PyPDF2")
+        for page in PyPDF2.PdfReader(uploaded_file).pages:
+            yield (page.extract_text() or "") + "\n"
+        return
+    
+    if uploaded_file.type == DOCX_TYPE:
+        if not DOCX_AVAILABLE:
+            raise RuntimeError("DOCX processing requires python-docx")
+        for paragraph in Document(uploaded_file).paragraphs:
+            yield paragraph.text + "\n"
+        return
+    
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    first = True
+    while True:
+        block = uploaded_file.read(block_size)
+        try:
+            text = decoder.decode(block, final=not block)
+        except UnicodeDecodeError:
+            if not first:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+                text = decoder.decode(block, final=not block)
+            else:
+                # Nothing yielded yet, so the whole file can still be read as latin-1
+                uploaded_file.seek(0)
+                while True:
+                    block = uploaded_file.read(block_size)
+                    if not block:
+                        return
+                    yield block.decode("latin-1")
+        first = False
+        if text:
+            yield text
+        if not block:
+            return
+
+def _extract_url_content(url):
+    """Extract content from URL using best available method"""
+    if NEWSPAPER_AVAILABLE:
+        try:
+            article = Article(url)
+            article.download()
+            article.parse()
+            if article.text and len(article.text.strip()) > 100:
+                return article.text, f"📰 Source: {url} (Advanced extraction)"
+        except Exception as e:
+            pass  # Fall back to other methods
+    
+    # Try enhanced extraction with BeautifulSoup
+    if BS4_AVAILABLE:
+        result = extract_url_content_enhanced(url)
+        if result[0] and not result[1].startswith("❌"):
+            return result[0], f"📰 Source: {url} (Enhanced extraction)"
+    
+    # Fall back to basic extraction
+    return extract_url_content_basic(url)
+
+def _uploaded_file_digest(uploaded_file):
+    """Hash the uploaded bytes so the same file maps to one cache entry across reruns"""
+    if hasattr(uploaded_file, "getvalue"):
+        data = uploaded_file.getvalue()
+    else:
+        data = uploaded_file.read()
+        uploaded_file.seek(0)
+    return content_hash("file", getattr(uploaded_file, "name", ""), getattr(uploaded_file, "type", ""), data)
+
+def process_uploaded_file(uploaded_file, cache=extraction_cache):
+    """Handle file uploads, reusing the parsed text of files seen before"""
+    if cache is None:
+        return _process_uploaded_file(uploaded_file)
+    
+    key = _uploaded_file_digest(uploaded_file)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    
+    result = _process_uploaded_file(uploaded_file)
+    if result[0] is not None:
+        cache.set(key, result, ttl=FILE_CACHE_TTL)
+    return result
+
+def _extract_and_cache(url, key, cache):
+    result = _extract_url_content(url)
+    if cache is not None and result[0] and not result[1].startswith("❌"):
+        cache.set(key, result, ttl=URL_CACHE_TTL)
+    return result
+
+def extract_url_content(url, cache=extraction_cache):
+    """Extract content from URL, reusing recent extractions of the same URL.
+
+    Concurrent requests for a URL that isn't cached yet share one fetch.
+    """
+    key = content_hash("url", url.strip())
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    
+    return url_flight.do(key, _extract_and_cache, url, key, cache)
@@ -0,0 +1,84 @@
+"""Hugging Face Inference API client"""
+import os
+
+from .circuit import CircuitBreaker
+from .inference_client import MODEL_LOADING, RETRIABLE_STATUS, InferenceClient
+
+# Hugging Face API Configuration (override HF_API_URL to point at a local stand-in server)
+HF_API_URL = os.environ.get("HF_API_URL", "https://api-inference.huggingface.co/models/facebook/bart-large-cnn")
+HF_TIMEOUT = float(os.environ.get("HF_TIMEOUT", 30))
+
+# Caps requests in flight to the Hugging Face host across all sessions in the process
+HF_MAX_IN_FLIGHT = int(os.environ.get("HF_MAX_IN_FLIGHT", 8))
+
+# Retry policy: cold starts (503) and throttling are retried with jittered exponential backoff
+HF_MAX_RETRIES = int(os.environ.get("HF_MAX_RETRIES", 4))
+HF_RETRY_DEADLINE = float(os.environ.get("HF_RETRY_DEADLINE", 60))
+HF_BACKOFF_BASE = float(os.environ.get("HF_BACKOFF_BASE", 1.0))
+HF_BACKOFF_MAX = float(os.environ.get("HF_BACKOFF_MAX", 20))
+
+# Trips after repeated failures or slow responses so callers fall back to the extractive path at once
+hf_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get("HF_BREAKER_FAILURES", 5)),
+    latency_threshold=float(os.environ.get("HF_BREAKER_LATENCY", 20)),
+    reset_timeout=float(os.environ.get("HF_BREAKER_RESET", 30)),
+    half_open_probes=int(os.environ.get("HF_BREAKER_PROBES", 1)),
+)
+
+hf_inference = InferenceClient(
+    HF_API_URL, hf_breaker, max_in_flight=HF_MAX_IN_FLIGHT, timeout=HF_TIMEOUT, deadline=HF_RETRY_DEADLINE,
+    max_retries=HF_MAX_RETRIES, backoff_base=HF_BACKOFF_BASE, backoff_max=HF_BACKOFF_MAX, cold_starts=True,
+    name="hf-client",
+)
+
+def hf_client_stats():
+    """Request, retry, failure and circuit breaker counters for the Hugging Face client"""
+    return hf_inference.stats()
+
+def query_huggingface_api(payload, api_key=None, api_url=None, timeout=HF_TIMEOUT,
+                          deadline=HF_RETRY_DEADLINE, max_retries=HF_MAX_RETRIES, breaker=hf_breaker):
+    """Query Hugging Face Inference API, retrying transient failures until ``deadline`` seconds pass"""
+    return hf_inference.query(payload, api_key, api_url, timeout, deadline, max_retries, breaker)
+
+def query_huggingface_api_batch(payloads, api_key=None, api_url=None, max_in_flight=HF_MAX_IN_FLIGHT,
+                                timeout=HF_TIMEOUT, breaker=hf_breaker):
+    """Send several payloads concurrently and return their results in payload order"""
+    return hf_inference.query_batch(payloads, api_key, api_url, max_in_flight, timeout, breaker)
+
+def summarization_payload(text, max_length, min_length):
+    """Build the summarization request body for one input text"""
+    return {
+        "inputs": text,
+        "parameters": {
+            "max_length": min(max_length, 500),  # API has limits
+            "min_length": min(min_length, max_length),
+            "do_sample": False
+        }
+    }
+
+def parse_summary_response(result):
+    """Return (summary_text, error) from an Inference API response"""
+    if "error" in result:
+        return None, result['error']
+    
+    if not result or not isinstance(result, list) or not result[0]:
+        return None, "Invalid response from API"
+    
+    summary_text = result[0].get('summary_text', '')
+    
+    if not summary_text:
+        return None, "No summary generated"
+    
+    return summary_text, None
+
+def request_summary_text(text, max_length, min_length, api_key=None, api_url=None):
+    """Summarize one input text and return (summary_text, error)"""
+    result = query_huggingface_api(summarization_payload(text, max_length, min_length), api_key, api_url)
+    return parse_summary_response(result)
+
+def request_summary_texts(texts, max_length, min_length, api_key=None, api_url=None,
+                          max_in_flight=HF_MAX_IN_FLIGHT):
+    """Summarize several texts concurrently; returns (summary_text, error) pairs in order"""
+    payloads = [summarization_payload(text, max_length, min_length) for text in texts]
+    results = query_huggingface_api_batch(payloads, api_key, api_url, max_in_flight)
+    return [parse_summary_response(result) for result in results]
@@ -0,0 +1,118 @@
+"""Shared keep-alive HTTP session for every outbound call"""
+import os
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+DEFAULT_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 30))
+DEFAULT_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+
+# Hosts we hit hard get bigger pools; override with configure_host()
+_host_pool_sizes = {
+    "api-inference.huggingface.co": int(os.environ.get("HF_POOL_SIZE", 32)),
+}
+
+_lock = threading.Lock()
+_session = None
+_stats = defaultdict(lambda: {"requests": 0, "connections": 0})
+
+
+def _count(host, field):
+    with _lock:
+        _stats[host][field] += 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count(self.host, "connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count(self.host, "connections")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that records requests and newly opened connections per host"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _count(urlsplit(request.url).hostname or "", "requests")
+        return super().send(request, **kwargs)
+
+
+def _mount_host(session, host, pool_size):
+    adapter = _PooledAdapter(pool_connections=1, pool_maxsize=pool_size)
+    for scheme in ("http://", "https://"):
+        session.mount(f"{scheme}{host}", adapter)
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                default = _PooledAdapter(pool_connections=DEFAULT_POOL_SIZE, pool_maxsize=DEFAULT_POOL_SIZE)
+                session.mount("http://", default)
+                session.mount("https://", default)
+                for host, pool_size in _host_pool_sizes.items():
+                    _mount_host(session, host, pool_size)
+                _session = session
+    return _session
+
+
+def configure_host(host, pool_size):
+    """Give ``host`` its own connection pool of ``pool_size`` keep-alive connections"""
+    with _lock:
+        _host_pool_sizes[host] = pool_size
+        session = _session
+    if session is not None:
+        _mount_host(session, host, pool_size)
+
+
+def _timeout(timeout):
+    if timeout is None:
+        return (CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    if isinstance(timeout, tuple):
+        return timeout
+    return (min(CONNECT_TIMEOUT, timeout), timeout)
+
+
+def http_get(url, timeout=None, **kwargs):
+    """GET through the shared session; a scalar timeout is the read timeout"""
+    return get_session().get(url, timeout=_timeout(timeout), **kwargs)
+
+
+def http_post(url, timeout=None, **kwargs):
+    """POST through the shared session; a scalar timeout is the read timeout"""
+    return get_session().post(url, timeout=_timeout(timeout), **kwargs)
+
+
+def connection_stats():
+    """Requests, opened connections and reuse ratio per host"""
+    with _lock:
+        result = {}
+        for host, counts in _stats.items():
+            requests_made = counts["requests"]
+            reused = max(requests_made - counts["connections"], 0)
+            result[host] = {
+                "requests": requests_made,
+                "connections": counts["connections"],
+                "reuse_ratio": reused / requests_made if requests_made else 0.0,
+            }
+        return result
@@ -0,0 +1,180 @@
+"""Retrying JSON client for one remote inference service"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from .http_pool import http_post
+
+RETRIABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+MODEL_LOADING = "Model loading, please wait..."
+
+# Passed as ``breaker`` to mean "this client's own breaker"; None turns the breaker off
+_OWN_BREAKER = object()
+
+def _retry_after(response):
+    """Server-suggested wait in seconds from the 503 body or Retry-After header"""
+    hints = []
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            hints.append(float(header))
+        except ValueError:
+            try:
+                hints.append((parsedate_to_datetime(header) - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    try:
+        body = response.json()
+        if isinstance(body, dict) and "estimated_time" in body:
+            hints.append(float(body["estimated_time"]))
+    except ValueError:
+        pass
+    return max(hints) if hints else 0.0
+
+def _is_loading(response):
+    """True if a 503 is the model cold-starting (its body carries estimated_time) rather than an outage"""
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "estimated_time" in body
+
+
+class InferenceClient:
+    """POSTs JSON payloads to one inference service.
+
+    Transient failures are retried with jittered exponential backoff until
+    ``deadline`` seconds pass, ``breaker`` sees one outcome per call, and at
+    most ``max_in_flight`` requests are on the wire at once. Each service
+    gets its own client, so caps, counters and breaker state are never
+    shared between backends. With ``cold_starts``, a 503 carrying
+    estimated_time (Hugging Face's model-loading reply) isn't held against
+    the breaker.
+    """
+
+    def __init__(self, api_url, breaker=None, max_in_flight=8, timeout=30.0, deadline=60.0, max_retries=4,
+                 backoff_base=1.0, backoff_max=20.0, cold_starts=False, name="inference"):
+        self.api_url = api_url
+        self.breaker = breaker
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cold_starts = cold_starts
+        # Every request holds a slot while it is on the wire, whichever thread sends it
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=name)
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "successes": 0, "retries": 0, "gave_up": 0, "fatal": 0, "short_circuited": 0}
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def stats(self):
+        """Request, retry, failure and circuit breaker counters for this client"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["breaker"] = self.breaker.stats() if self.breaker is not None else None
+        return stats
+
+    def _post_once(self, payload, api_key, api_url, timeout):
+        """One request; returns (result, retry_after) where retry_after is None if not retriable"""
+        headers = {}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        try:
+            response = http_post(api_url or self.api_url, headers=headers, json=payload, timeout=timeout)
+            if response.status_code == 200:
+                return response.json(), None
+            elif response.status_code == 503 and self.cold_starts and _is_loading(response):
+                return {"error": MODEL_LOADING}, _retry_after(response)
+            elif response.status_code in RETRIABLE_STATUS:
+                return {"error": f"API Error: {response.status_code}"}, _retry_after(response)
+            else:
+                return {"error": f"API Error: {response.status_code}"}, None
+        except Exception as e:
+            return {"error": f"Connection error: {str(e)}"}, 0.0
+
+    def query(self, payload, api_key=None, api_url=None, timeout=None, deadline=None, max_retries=None,
+              breaker=_OWN_BREAKER):
+        """POST ``payload``, retrying transient failures; returns the JSON reply or an {"error": ...} dict.
+
+        The breaker sees one outcome per call, once retrying is over, so a
+        single slow cold start can't open it on its own.
+        """
+        breaker = self.breaker if breaker is _OWN_BREAKER else breaker
+        timeout = self.timeout if timeout is None else timeout
+        deadline = self.deadline if deadline is None else deadline
+        max_retries = self.max_retries if max_retries is None else max_retries
+        if breaker is not None and not breaker.allow_request():
+            self._count("short_circuited")
+            return {"error": "Inference API temporarily unavailable (circuit open)"}
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self._count("requests")
+            remaining = deadline - (time.monotonic() - started)
+            # Backoff sleeps happen outside the slot, so a retrying call doesn't hold one idle
+            with self._in_flight:
+                sent_at = time.monotonic()
+                result, retry_after = self._post_once(payload, api_key, api_url, min(timeout, max(remaining, 1.0)))
+                latency = time.monotonic() - sent_at
+
+            if retry_after is None:
+                self._count("fatal" if isinstance(result, dict) and "error" in result else "successes")
+                break
+
+            attempt += 1
+            backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+            delay = max(retry_after, backoff)
+            remaining = deadline - (time.monotonic() - started)
+            if attempt > max_retries or delay >= remaining:
+                self._count("gave_up")
+                break
+
+            self._count("retries")
+            time.sleep(delay)
+
+        if breaker is not None:
+            if retry_after is None:
+                # Client errors (400, 401, 413) mean the service itself is answering
+                breaker.record_success(latency)
+            elif result.get("error") == MODEL_LOADING:
+                # A model still warming up is answering too; it just isn't ready yet
+                breaker.record_ignored()
+            else:
+                breaker.record_failure()
+        return result
+
+    def query_batch(self, payloads, api_key=None, api_url=None, max_in_flight=None, timeout=None,
+                    breaker=_OWN_BREAKER):
+        """Send several payloads concurrently and return their results in payload order.
+
+        At most ``max_in_flight`` of these payloads are outstanding at once;
+        the client-wide cap still applies on top.
+        """
+        max_in_flight = self.max_in_flight if max_in_flight is None else max_in_flight
+        if len(payloads) <= 1 or max_in_flight <= 1:
+            return [self.query(payload, api_key, api_url, timeout, breaker=breaker) for payload in payloads]
+
+        slots = threading.BoundedSemaphore(max_in_flight)
+
+        def run(payload):
+            try:
+                return self.query(payload, api_key, api_url, timeout, breaker=breaker)
+            finally:
+                slots.release()
+
+        futures = []
+        for payload in payloads:
+            slots.acquire()
+            futures.append(self._executor.submit(run, payload))
+        return [future.result() for future in futures]
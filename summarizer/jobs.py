@@ -0,0 +1,268 @@
+"""Persistent background job queue for summaries too slow to hold a request open"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from .extractors import UploadedBytes, extract_url_content, process_uploaded_file, upload_source_info
+from .summarizers import create_smart_summary, summarize_uploaded_file
+
+JOB_DB_PATH = os.environ.get("SUMMARY_JOB_DB", "summary_jobs.sqlite3")
+JOB_WORKERS = int(os.environ.get("SUMMARY_JOB_WORKERS", 4))
+# Finished jobs (and their results) are kept this many seconds for clients to collect
+JOB_RETENTION = float(os.environ.get("SUMMARY_JOB_RETENTION", 24 * 3600))
+# Queued jobs allowed before submit() refuses new ones
+JOB_QUEUE_LIMIT = int(os.environ.get("SUMMARY_JOB_QUEUE_LIMIT", 10000))
+
+# Lower runs first; within a class, jobs run in submission order
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+KINDS = ("text", "url", "file")
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when JOB_QUEUE_LIMIT jobs are already waiting"""
+
+
+def run_job(kind, params, payload=None, api_key=None):
+    """Extract and summarize one job's input; returns the result dict or raises ValueError"""
+    started = time.perf_counter()
+    options = params["options"]
+    if kind == "file" and not options.get("use_ai", True):
+        return _run_file_job_stream(params, payload, started)
+    if kind == "text":
+        content, source_info = params["text"], None
+    elif kind == "url":
+        content, source_info = extract_url_content(params["url"])
+        if content and source_info.startswith("❌"):
+            content = None
+    else:
+        upload = UploadedBytes(payload, params.get("filename", "upload.txt"), params.get("type"))
+        content, source_info = process_uploaded_file(upload)
+    extracted = time.perf_counter()
+
+    if content is None:
+        raise ValueError(source_info)
+    if len(content.strip()) < 30:
+        raise ValueError("❌ Content too short for summarization")
+    summary, sentences, words = create_smart_summary(content, api_key=api_key, **options)
+    if summary.startswith("Error") or summary.startswith("AI Error"):
+        raise ValueError(summary)
+    return {
+        "summary": summary,
+        "sentences": sentences,
+        "words": words,
+        "input_words": len(content.split()),
+        "source": source_info,
+        "extract_ms": round((extracted - started) * 1000, 1),
+        "summarize_ms": round((time.perf_counter() - extracted) * 1000, 1),
+    }
+
+
+def _run_file_job_stream(params, payload, started):
+    """Extractive file job that streams the upload's text instead of decoding it whole"""
+    options = params["options"]
+    upload = UploadedBytes(payload, params.get("filename", "upload.txt"), params.get("type"))
+    summary, sentences, words, input_words = summarize_uploaded_file(
+        upload, options["target_sentences"], options["target_words"], options.get("priority", "sentences"),
+        options.get("mmr_lambda"),
+    )
+    return {
+        "summary": summary,
+        "sentences": sentences,
+        "words": words,
+        "input_words": input_words,
+        "source": upload_source_info(upload),
+        "extract_ms": 0.0,
+        "summarize_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+class JobQueue:
+    """Priority job queue persisted in SQLite and worked by a pool of threads.
+
+    Jobs survive a restart: anything still queued, or running when the
+    process died, is picked up again on start. API keys are held in memory
+    only, so a job resumed after a restart runs without one. Callables in
+    ``listeners`` are called with the job id whenever a job finishes.
+    ``get`` and ``stats`` read through a connection of their own, so they
+    don't wait while a large upload is being written.
+    """
+
+    def __init__(self, db_path=JOB_DB_PATH, workers=JOB_WORKERS, retention=JOB_RETENTION,
+                 queue_limit=JOB_QUEUE_LIMIT, start=True):
+        self.retention = retention
+        self.queue_limit = queue_limit
+        self.listeners = []
+        self._api_keys = {}
+        self._lock = threading.RLock()
+        self._available = threading.Condition(self._lock)
+        self._finished = threading.Condition(self._lock)
+        self._expired_at = 0.0
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, priority INTEGER, status TEXT, params TEXT, payload BLOB, "
+            "result TEXT, error TEXT, created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at)")
+        self._db.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING))
+        self._db.commit()
+        if db_path == ":memory:":
+            self._reader, self._read_lock = self._db, self._lock
+        else:
+            # WAL lets this connection read while the other one is mid-write
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._reader = sqlite3.connect(db_path, check_same_thread=False)
+            self._read_lock = threading.Lock()
+        self._threads = []
+        if start:
+            for i in range(workers):
+                thread = threading.Thread(target=self._work, name=f"summary-job-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, params, payload=None, priority_class="normal", api_key=None):
+        """Queue a job and return its id.
+
+        ``params`` holds "options" (create_smart_summary keyword arguments)
+        plus "text", "url" or "filename"/"type" depending on ``kind``;
+        ``payload`` is the raw bytes of a file job.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        if priority_class not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority_class!r}")
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            depth = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if depth >= self.queue_limit:
+                raise QueueFull(f"{depth} jobs already queued")
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, priority, status, params, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, PRIORITIES[priority_class], QUEUED, json.dumps(params), payload, time.time()),
+            )
+            self._db.commit()
+            if api_key:
+                self._api_keys[job_id] = api_key
+            self._available.notify()
+        return job_id
+
+    def get(self, job_id):
+        """Public state of a job as a dict, or None if unknown or expired"""
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT id, kind, priority, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, kind, priority, status, result, error, created_at, started_at, finished_at = row
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "priority_class": next(name for name, rank in PRIORITIES.items() if rank == priority),
+            "status": status,
+            "created_at": created_at,
+        }
+        if started_at is not None:
+            job["wait_ms"] = round((started_at - created_at) * 1000, 1)
+        if finished_at is not None:
+            job["run_ms"] = round((finished_at - started_at) * 1000, 1)
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def wait(self, job_id, timeout):
+        """Block until the job finishes or ``timeout`` seconds pass; returns get(job_id)"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            job = self.get(job_id)
+            while job is not None and job["status"] in (QUEUED, RUNNING):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._finished.wait(remaining)
+                job = self.get(job_id)
+        return job
+
+    def stats(self):
+        """Queue depth per priority, job counts, and wait/run times of recently finished jobs"""
+        with self._read_lock:
+            depth = dict(self._reader.execute(
+                "SELECT priority, COUNT(*) FROM jobs WHERE status = ? GROUP BY priority", (QUEUED,)
+            ).fetchall())
+            counts = dict(self._reader.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            timings = self._reader.execute(
+                "SELECT started_at - created_at, finished_at - started_at FROM jobs "
+                "WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT 1000"
+            ).fetchall()
+        waits = sorted(t[0] for t in timings)
+        runs = sorted(t[1] for t in timings)
+
+        def summary(values):
+            if not values:
+                return {"mean_ms": 0.0, "p95_ms": 0.0}
+            return {
+                "mean_ms": round(sum(values) / len(values) * 1000, 1),
+                "p95_ms": round(values[min(int(len(values) * 0.95), len(values) - 1)] * 1000, 1),
+            }
+
+        return {
+            "depth": {name: depth.get(rank, 0) for name, rank in PRIORITIES.items()},
+            "counts": {status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)},
+            "wait": summary(waits),
+            "run": summary(runs),
+        }
+
+    def _claim(self):
+        """Mark the next queued job running and return it, or None if the queue is empty"""
+        row = self._db.execute(
+            "SELECT id, kind, params, payload FROM jobs WHERE status = ? "
+            "ORDER BY priority, created_at LIMIT 1", (QUEUED,),
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ?", (RUNNING, time.time(), row[0]))
+        self._db.commit()
+        return row
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._expire()
+                row = self._claim()
+                while row is None:
+                    self._available.wait(timeout=60)
+                    self._expire()
+                    row = self._claim()
+                api_key = self._api_keys.pop(row[0], None)
+            job_id, kind, params, payload = row
+            try:
+                result, error = json.dumps(run_job(kind, json.loads(params), payload, api_key)), None
+            except Exception as e:
+                result, error = None, str(e)
+            with self._lock:
+                # The input isn't needed once the job has run, so large uploads don't sit in the database
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, payload = NULL "
+                    "WHERE id = ?", (FAILED if error else DONE, result, error, time.time(), job_id),
+                )
+                self._db.commit()
+                self._finished.notify_all()
+            for listener in list(self.listeners):
+                listener(job_id)
+
+    def _expire(self):
+        """Drop finished jobs past retention, at most once a minute"""
+        now = time.monotonic()
+        if now - self._expired_at < 60:
+            return
+        self._expired_at = now
+        self._db.execute("DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.retention,))
+        self._db.commit()
@@ -0,0 +1,113 @@
+"""Map-reduce summarization for documents longer than the model context window"""
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .backends import get_backend
+from .hf_client import HF_MAX_IN_FLIGHT
+from .text import clean_and_split_sentences
+
+# bart-large-cnn reads ~1024 tokens; 700 words leaves headroom for subword splits
+CHUNK_WORDS = int(os.environ.get("SUMMARY_CHUNK_WORDS", 700))
+CHUNK_OVERLAP = int(os.environ.get("SUMMARY_CHUNK_OVERLAP", 1))
+CHUNK_CONCURRENCY = int(os.environ.get("SUMMARY_CHUNK_CONCURRENCY", HF_MAX_IN_FLIGHT))
+REDUCE_DEPTH = int(os.environ.get("SUMMARY_REDUCE_DEPTH", 3))
+# Shortest partial summary asked of one chunk, however many chunks a pass has
+MIN_PARTIAL_WORDS = int(os.environ.get("SUMMARY_MIN_PARTIAL_WORDS", 20))
+
+
+def chunk_sentences(sentences, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Group sentences into chunks of at most ``chunk_words`` words.
+
+    The last ``overlap`` sentences of each chunk are repeated at the start of
+    the next one so facts spanning a boundary keep their context. A single
+    sentence longer than the window is cut into word slices.
+    """
+    pieces = []
+    for sentence in sentences:
+        words = sentence.split()
+        if len(words) <= chunk_words:
+            pieces.append((sentence, len(words)))
+        else:
+            for start in range(0, len(words), chunk_words):
+                part = words[start:start + chunk_words]
+                pieces.append((' '.join(part), len(part)))
+
+    chunks = []
+    current = []
+    current_words = 0
+    for piece in pieces:
+        if current and current_words + piece[1] > chunk_words:
+            chunks.append(' '.join(p[0] for p in current))
+            carried = current[-overlap:] if overlap > 0 else []
+            # Drop the carried context if it would leave no room for new text
+            while carried and sum(p[1] for p in carried) + piece[1] > chunk_words:
+                carried = carried[1:]
+            current = list(carried)
+            current_words = sum(p[1] for p in current)
+        current.append(piece)
+        current_words += piece[1]
+    if current:
+        chunks.append(' '.join(p[0] for p in current))
+    return chunks
+
+
+def _summarize_reporting(backend, chunks, max_length, min_length, api_key, concurrency, report):
+    """backend.summarize over ``chunks``, calling ``report(index, summary_text)`` as each one lands"""
+    results = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        futures = {
+            pool.submit(backend.summarize, [chunk], max_length, min_length, api_key): index
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()[0]
+            if results[index][1] is None:
+                report(index, results[index][0].strip())
+    return results
+
+def map_reduce_text(text, target_sentences, target_words, api_key=None, chunk_words=CHUNK_WORDS,
+                    overlap=CHUNK_OVERLAP, concurrency=CHUNK_CONCURRENCY, max_depth=REDUCE_DEPTH, backend=None,
+                    on_chunk=None):
+    """Condense ``text`` until it fits one model window.
+
+    Each pass splits the text into sentence-aligned chunks, summarizes them
+    concurrently and joins the partial summaries, each sized so the joined
+    result fits ``chunk_words``. Passes repeat until it does; if it still
+    doesn't after ``max_depth`` passes, the text is cut to its leading
+    sentences that fit, so the model is never sent more than one window.
+    Returns (text, error); the caller makes the final pass to hit the targets.
+    ``on_chunk(pass_number, index, total, summary_text)`` is called from a
+    worker thread as each chunk summary finishes, in completion order.
+    """
+    backend = backend or get_backend()
+    for depth in range(max_depth + 1):
+        sentences = clean_and_split_sentences(text)
+        if sum(len(s.split()) for s in sentences) <= chunk_words:
+            break
+        if depth == max_depth:
+            # Out of passes: keep what fits rather than have the model truncate or reject it
+            return chunk_sentences(sentences, chunk_words, 0)[0], None
+        chunks = chunk_sentences(sentences, chunk_words, overlap)
+
+        # Size partial summaries so the joined result fits one window
+        chunk_target = max(chunk_words // len(chunks), MIN_PARTIAL_WORDS)
+        max_length = chunk_target + 20
+        min_length = max(chunk_target // 2, 10)
+
+        if on_chunk is None:
+            results = backend.summarize(chunks, max_length, min_length, api_key, max_in_flight=concurrency)
+        else:
+            results = _summarize_reporting(
+                backend, chunks, max_length, min_length, api_key, concurrency,
+                lambda index, summary_text: on_chunk(depth + 1, index, len(chunks), summary_text),
+            )
+
+        partials = []
+        for summary_text, error in results:
+            if error:
+                return None, error
+            partials.append(summary_text.strip())
+        text = ' '.join(partials)
+
+    return text, None
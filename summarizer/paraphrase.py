@@ -0,0 +1,159 @@
+"""Paraphrase rule sets loaded from per-domain files and compiled into one matcher"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+RULES_DIR = os.environ.get("PARAPHRASE_RULES_DIR", os.path.join(os.path.dirname(__file__), "rules"))
+# Comma-separated domain names in priority order (later wins on conflicts); empty means every file
+RULE_DOMAINS = [d.strip() for d in os.environ.get("PARAPHRASE_DOMAINS", "").split(",") if d.strip()]
+# How often, in seconds, rewrite() checks the rule files for edits
+RELOAD_INTERVAL = float(os.environ.get("PARAPHRASE_RELOAD_INTERVAL", 5))
+
+
+def _trie_pattern(phrases):
+    """Regex source matching any of ``phrases``, factored into a prefix trie.
+
+    A flat ``a|b|c`` alternation retries every phrase at every position; the
+    trie form checks one character class per level, so cost stays flat as the
+    rule count grows. Optional tails are greedy, so the longest phrase wins.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        ends_here = '' in node
+        if len(branches) == 1 and not ends_here:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if ends_here else body
+
+    return build(trie)
+
+
+class Paraphraser:
+    """Rewrites text with a phrase table in a single left-to-right pass.
+
+    The rules are compiled once into one trie-shaped regex that only matches
+    whole words, so 'server' leaves 'observer' alone. The longest phrase wins
+    at each position and replacement text is never scanned again, so one
+    rule's output can't be rewritten by another.
+    """
+
+    def __init__(self, rules):
+        self.rules = dict(rules)
+        self.pattern = None
+        if self.rules:
+            self.pattern = re.compile(r'(?<!\w)' + _trie_pattern(self.rules) + r'(?!\w)')
+
+    def rewrite(self, text):
+        if self.pattern is None:
+            return text
+        rules = self.rules
+        return self.pattern.sub(lambda match: rules[match.group(0)], text)
+
+
+def _rule_files(rules_dir, domains):
+    if domains:
+        return [os.path.join(rules_dir, f"{domain}.json") for domain in domains]
+    return sorted(
+        os.path.join(rules_dir, name) for name in os.listdir(rules_dir) if name.endswith(".json")
+    )
+
+
+def load_rule_files(paths):
+    """Merge rule files into one table; returns (rules, {domain: version})"""
+    rules = {}
+    versions = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        domain = data.get("domain") or os.path.splitext(os.path.basename(path))[0]
+        versions[domain] = data.get("version", 0)
+        rules.update(data.get("rules", {}))
+    return rules, versions
+
+
+class RuleSet:
+    """Compiled paraphrase rules that reload themselves when their files change.
+
+    ``rewrite`` checks file modification times at most every
+    ``reload_interval`` seconds and swaps in a freshly compiled Paraphraser
+    when any changed, so edits apply without restarting the server. A file
+    that fails to parse keeps the previous rules in place.
+    """
+
+    def __init__(self, rules_dir=RULES_DIR, domains=None, reload_interval=RELOAD_INTERVAL):
+        self.rules_dir = rules_dir
+        self.domains = list(domains if domains is not None else RULE_DOMAINS)
+        self.reload_interval = reload_interval
+        self.versions = {}
+        self.fingerprint = ""
+        self.last_error = None
+        self._paraphraser = Paraphraser({})
+        self._mtimes = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def rules(self):
+        return self._paraphraser.rules
+
+    def _stat(self):
+        paths = _rule_files(self.rules_dir, self.domains)
+        return paths, tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+
+    def reload(self, force=True):
+        """Recompile from disk; with ``force=False`` only if a file changed. Returns True on reload."""
+        with self._lock:
+            try:
+                paths, mtimes = self._stat()
+                if not force and mtimes == self._mtimes:
+                    return False
+                rules, versions = load_rule_files(paths)
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                return False
+            paraphraser = Paraphraser(rules)
+            self._paraphraser = paraphraser
+            self._mtimes = mtimes
+            self.versions = versions
+            self.fingerprint = hashlib.sha256(
+                json.dumps(rules, sort_keys=True).encode("utf-8")
+            ).hexdigest()[:16]
+            self.last_error = None
+            return True
+
+    def maybe_reload(self):
+        now = time.monotonic()
+        if self.reload_interval is not None and now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            self.reload(force=False)
+
+    def rewrite(self, text):
+        self.maybe_reload()
+        return self._paraphraser.rewrite(text)
+
+
+_default_rules = None
+_default_lock = threading.Lock()
+
+
+def default_rule_set():
+    """The process-wide rule set used by smart_paraphrase"""
+    global _default_rules
+    if _default_rules is None:
+        with _default_lock:
+            if _default_rules is None:
+                _default_rules = RuleSet()
+    return _default_rules
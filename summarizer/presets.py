@@ -0,0 +1,38 @@
+"""Summary length presets"""
+
+# Define preset configurations
+# mmr_lambda trades relevance against novelty when picking sentences; longer summaries lean on novelty
+PRESETS = {
+    "tweet": {
+        "name": "📱 Tweet/Social",
+        "description": "Perfect for social media posts",
+        "sentences": 2,
+        "target_words": 45,
+        "max_words": 55,
+        "mmr_lambda": 0.8
+    },
+    "quick": {
+        "name": "📄 Quick Summary", 
+        "description": "Brief overview of key points",
+        "sentences": 5,
+        "target_words": 75,
+        "max_words": 90,
+        "mmr_lambda": 0.7
+    },
+    "executive": {
+        "name": "📊 Executive Brief",
+        "description": "Professional summary for business",
+        "sentences": 7,
+        "target_words": 110,
+        "max_words": 130,
+        "mmr_lambda": 0.7
+    },
+    "detailed": {
+        "name": "📚 Detailed Summary",
+        "description": "Comprehensive overview",
+        "sentences": 10,
+        "target_words": 170,
+        "max_words": 200,
+        "mmr_lambda": 0.6
+    }
+}
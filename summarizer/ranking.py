@@ -0,0 +1,241 @@
+"""Vectorized extractive sentence ranking (TF-IDF centrality and TextRank)"""
+import importlib.util
+import os
+import re
+
+# NumPy/SciPy are optional and slow to import, so they are only loaded on first use
+RANKING_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("numpy", "scipy"))
+
+# "textrank", "tfidf" or "position" (the original first/middle/last pick)
+SUMMARY_RANKER = os.environ.get("SUMMARY_RANKER", "textrank")
+# Only this many of the most central sentences are compared pairwise, keeping TextRank
+# and MMR at O(n * pool) however long the document is
+RANK_POOL = int(os.environ.get("SUMMARY_RANK_POOL", 256))
+# MMR never picks a sentence at least this similar to one already chosen while others remain
+DUPLICATE_SIMILARITY = float(os.environ.get("SUMMARY_DUPLICATE_SIMILARITY", 0.8))
+
+_TOKEN = re.compile(r"[A-Za-z0-9][A-Za-z0-9'-]*")
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself yourselves
+said says say one two new
+""".split())
+
+
+def sentence_term_matrix(sentences):
+    """L2-normalized TF-IDF matrix (sentences x terms) as a SciPy CSR matrix.
+
+    ``sentences`` may be strings or (text, start, end) triples; the triple
+    form tokenizes a slice of the document without copying it first.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    vocabulary = {}
+    rows = []
+    cols = []
+    for row, sentence in enumerate(sentences):
+        if isinstance(sentence, tuple):
+            tokens = _TOKEN.findall(sentence[0], sentence[1], sentence[2])
+        else:
+            tokens = _TOKEN.findall(sentence)
+        for token in tokens:
+            token = token.lower()
+            if token in STOPWORDS:
+                continue
+            col = vocabulary.setdefault(token, len(vocabulary))
+            rows.append(row)
+            cols.append(col)
+
+    n_sentences = len(sentences)
+    if not cols:
+        return sparse.csr_matrix((n_sentences, 0))
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(cols)), (np.asarray(rows), np.asarray(cols))),
+        shape=(n_sentences, len(vocabulary)),
+    )
+    counts.sum_duplicates()
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_sentences) / (1 + document_frequency)) + 1.0
+    weighted = counts.multiply(idf).tocsr()
+
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ weighted
+
+
+def tfidf_scores(matrix):
+    """Cosine similarity of each sentence to the document centroid"""
+    import numpy as np
+
+    centroid = np.asarray(matrix.mean(axis=0)).ravel()
+    length = np.linalg.norm(centroid)
+    if length == 0:
+        return np.zeros(matrix.shape[0])
+    return matrix @ (centroid / length)
+
+
+def similarity_matrix(matrix):
+    """Sparse sentence-by-sentence cosine similarity with a zero diagonal.
+
+    Quadratic in the number of rows: only call it on a bounded pool.
+    """
+    similarity = (matrix @ matrix.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def textrank_scores(matrix, damping=0.85, iterations=50, tolerance=1e-6, similarity=None):
+    """PageRank over the cosine-similarity graph of the sentences"""
+    import numpy as np
+    from scipy import sparse
+
+    n_sentences = matrix.shape[0]
+    if n_sentences == 0:
+        return np.zeros(0)
+    if similarity is None:
+        similarity = similarity_matrix(matrix)
+
+    out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    out_weight[dangling] = 1.0
+    transition_t = (sparse.diags(1.0 / out_weight) @ similarity).T.tocsr()
+
+    scores = np.full(n_sentences, 1.0 / n_sentences)
+    for _ in range(iterations):
+        # Sentences with no similar neighbours spread their rank evenly
+        spread = scores[dangling].sum() / n_sentences
+        updated = (1 - damping) / n_sentences + damping * (transition_t @ scores + spread)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def rank_sentences(sentences, method=None, pool_size=RANK_POOL):
+    """Score the most promising sentences with ``method`` ("textrank" or "tfidf").
+
+    Every sentence gets a linear-cost TF-IDF centroid score; only the
+    ``pool_size`` best of those are kept as candidates, and TextRank runs on
+    that pool alone, so no pairwise structure ever grows with the document.
+    Returns (pool, scores, vectors): candidate indices in document order,
+    their scores (higher is more central) and their TF-IDF rows, which
+    mmr_select uses for on-demand similarity.
+    """
+    import numpy as np
+
+    method = method or SUMMARY_RANKER
+    if method not in ("tfidf", "textrank"):
+        raise ValueError(f"Unknown ranking method: {method!r}")
+    matrix = sentence_term_matrix(sentences)
+    centrality = tfidf_scores(matrix)
+    if len(centrality) > pool_size:
+        pool = np.sort(np.argsort(-centrality, kind="stable")[:pool_size])
+        vectors = matrix[pool]
+    else:
+        pool = np.arange(len(centrality))
+        vectors = matrix
+    if method == "tfidf":
+        scores = centrality[pool]
+    else:
+        scores = textrank_scores(vectors)
+    return pool.tolist(), scores, vectors
+
+
+def similarity_row(vectors, index):
+    """Cosine similarity of row ``index`` to every row of the L2-normalized CSR ``vectors``"""
+    import numpy as np
+
+    # Densify the one row straight from the CSR arrays; slicing the matrix costs several times more
+    start, end = vectors.indptr[index], vectors.indptr[index + 1]
+    query = np.zeros(vectors.shape[1])
+    query[vectors.indices[start:end]] = vectors.data[start:end]
+    return vectors @ query
+
+
+def mmr_order(relevance, vectors, count=None, mmr_lambda=0.7, lengths=None, budget=None, rows=None,
+              duplicate_similarity=DUPLICATE_SIMILARITY):
+    """Greedy Maximal Marginal Relevance picks; returns (indices in pick order, gain of each pick).
+
+    Each pick maximizes ``mmr_lambda * relevance - (1 - mmr_lambda) * redundancy``,
+    where redundancy is the highest cosine similarity to anything already
+    picked. Candidates at least ``duplicate_similarity`` similar are passed
+    over while any other candidate is left. With ``lengths`` and ``budget``,
+    only sentences that fit the words still left are candidates, near
+    duplicates never are, and picking stops when nothing fits. Only picked
+    sentences' similarity rows are computed (and kept in ``rows``, a dict,
+    when given), so each pick costs O(n) rather than a full n x n matrix.
+    """
+    import numpy as np
+
+    relevance = np.asarray(relevance, dtype=float)
+    n_sentences = len(relevance)
+    if n_sentences == 0:
+        return [], []
+    top = relevance.max()
+    if top > 0:
+        relevance = relevance / top
+    count = n_sentences if count is None else min(count, n_sentences)
+    if budget is not None:
+        lengths = np.asarray(lengths)
+        remaining = budget
+
+    redundancy = np.zeros(n_sentences)
+    available = np.ones(n_sentences, dtype=bool)
+    order = []
+    gains = []
+    while len(order) < count:
+        if order:
+            # The last pick's row is only needed once another pick is to be made
+            pick = order[-1]
+            row = rows.get(pick) if rows is not None else None
+            if row is None:
+                row = similarity_row(vectors, pick)
+                if rows is not None:
+                    rows[pick] = row
+            redundancy = np.maximum(redundancy, row)
+        eligible = available if budget is None else available & (lengths <= remaining)
+        distinct = eligible & (redundancy < duplicate_similarity)
+        if budget is not None or distinct.any():
+            eligible = distinct
+        if not eligible.any():
+            break
+        gain = np.where(eligible, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+        pick = int(np.argmax(gain))
+        order.append(pick)
+        gains.append(float(gain[pick]))
+        available[pick] = False
+        if budget is not None:
+            remaining -= lengths[pick]
+    return order, gains
+
+
+def mmr_select(relevance, vectors, count, mmr_lambda=0.7, rows=None):
+    """``count`` MMR picks (see mmr_order), returned in document order"""
+    order, _ = mmr_order(relevance, vectors, count, mmr_lambda, rows=rows)
+    return sorted(order)
+
+
+def mmr_within_budget(relevance, vectors, lengths, budget, mmr_lambda=0.7, rows=None):
+    """MMR picks that fit ``budget`` words, in document order; the shortest sentence if none fits"""
+    order, _ = mmr_order(relevance, vectors, mmr_lambda=mmr_lambda, lengths=lengths, budget=budget, rows=rows)
+    if not order and len(lengths):
+        order = [min(range(len(lengths)), key=lengths.__getitem__)]
+    return sorted(order)
+
+
+def top_in_order(scores, count):
+    """Indices of the ``count`` best scores, returned in document order"""
+    import numpy as np
+
+    if count >= len(scores):
+        return list(range(len(scores)))
+    # Stable sort on -score so ties go to the earlier sentence
+    best = np.argsort(-np.asarray(scores), kind="stable")[:count]
+    return sorted(best.tolist())
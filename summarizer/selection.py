@@ -0,0 +1,82 @@
+"""Budgeted sentence selection: best total score within a word budget"""
+import importlib.util
+import os
+
+# NumPy is optional and only imported when the exact knapsack runs
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+# Words a "words first" summary may run over its target
+WORD_TOLERANCE = int(os.environ.get("SUMMARY_WORD_TOLERANCE", 5))
+# The exact knapsack runs over this many best-scoring sentences; the rest fill in greedily
+EXACT_POOL = 64
+
+
+def _greedy(candidates, scores, lengths, budget, chosen=None):
+    """Add candidates by score per word while they fit"""
+    chosen = set(chosen or ())
+    used = sum(lengths[i] for i in chosen)
+    for i in sorted(candidates, key=lambda i: -scores[i] / max(lengths[i], 1)):
+        if i not in chosen and used + lengths[i] <= budget:
+            chosen.add(i)
+            used += lengths[i]
+    return chosen
+
+
+def _knapsack(candidates, scores, lengths, budget):
+    """Exact 0/1 knapsack over ``candidates`` by dynamic programming on word counts"""
+    import numpy as np
+
+    best = np.zeros(budget + 1)
+    take = np.zeros((len(candidates), budget + 1), dtype=bool)
+    for k, i in enumerate(candidates):
+        length = lengths[i]
+        if length > budget:
+            continue
+        with_item = best[:budget + 1 - length] + scores[i]
+        improves = with_item > best[length:]
+        take[k, length:] = improves
+        best[length:] = np.where(improves, with_item, best[length:])
+
+    chosen = set()
+    remaining = budget
+    for k in range(len(candidates) - 1, -1, -1):
+        if take[k, remaining]:
+            i = candidates[k]
+            chosen.add(i)
+            remaining -= lengths[i]
+    return chosen
+
+
+def select_within_budget(scores, lengths, budget, exact_pool=EXACT_POOL):
+    """Indices, in document order, maximizing total score with total length <= ``budget``.
+
+    The ``exact_pool`` best-scoring sentences are solved exactly as a
+    knapsack; remaining room is then filled greedily by score per word from
+    the rest. Without NumPy the whole selection is greedy. Always returns at
+    least one sentence when there is any, even if it alone exceeds the budget.
+    """
+    n = len(scores)
+    if n == 0:
+        return []
+    budget = max(int(budget), 0)
+    by_score = sorted(range(n), key=lambda i: -scores[i])
+
+    if NUMPY_AVAILABLE:
+        chosen = _knapsack(by_score[:exact_pool], scores, lengths, budget)
+    else:
+        chosen = _greedy(by_score[:exact_pool], scores, lengths, budget)
+    chosen = _greedy(by_score[exact_pool:], scores, lengths, budget, chosen)
+
+    if not chosen:
+        chosen = {min(range(n), key=lambda i: lengths[i])}
+    return sorted(chosen)
+
+
+def prefix_within_budget(lengths, budget):
+    """Number of leading sentences that fit ``budget`` words (at least one)"""
+    used = 0
+    for count, length in enumerate(lengths):
+        if used + length > budget:
+            return max(count, 1)
+        used += length
+    return len(lengths)
@@ -0,0 +1,445 @@
+"""Asyncio HTTP JSON service over the summarizer (standard library only).
+
+    python -m summarizer.service --port 8080
+
+    POST /summarize/text   {"text": "...", "preset": "quick"}
+    POST /summarize/url    {"url": "https://...", "sentences": 4, "words": 80}
+    POST /summarize/file?filename=report.pdf   (raw file bytes as the body)
+    GET  /health
+
+    POST /jobs/text, /jobs/url, /jobs/file   same inputs, plus "priority_class":
+                                              "high", "normal" or "low"; returns 202 and a job_id
+    GET  /jobs/<job_id>?wait=30               job state; waits up to 30s for it to finish
+    GET  /jobs                                queue depth, wait and run times
+
+Summary options ("preset", "sentences", "words", "priority", "use_ai",
+"api_key", "latency_budget") go in the JSON body, or in the query string for
+/summarize/file. With "latency_budget" (seconds), the extractive summary is
+returned if the AI one isn't ready in time.
+Responses are JSON with the summary and a "timings" object in milliseconds.
+Extraction and summarization run in bounded thread pools so the event loop
+never blocks; past SERVICE_QUEUE_LIMIT admitted requests, new ones are
+turned away at once with 503 and Retry-After.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+
+from .extractors import (
+    UploadedBytes,
+    extract_url_content,
+    extraction_cache,
+    process_uploaded_file,
+    upload_source_info,
+    url_flight,
+)
+from .backends import backend_stats
+from .hf_client import hf_client_stats
+from .jobs import DONE, FAILED, JOB_DB_PATH, JOB_WORKERS, PRIORITIES, JobQueue, QueueFull
+from .presets import PRESETS
+from .summarizers import LATENCY_BUDGET, ai_flight, create_smart_summary, race_stats, summarize_uploaded_file, summary_cache
+
+# URL fetches and AI calls mostly wait on the network; file parsing and extractive ranking use the CPU
+SERVICE_IO_WORKERS = int(os.environ.get("SERVICE_IO_WORKERS", 32))
+SERVICE_CPU_WORKERS = int(os.environ.get("SERVICE_CPU_WORKERS", os.cpu_count() or 1))
+# Requests admitted (running or waiting for a worker) before new ones get 503
+SERVICE_QUEUE_LIMIT = int(os.environ.get("SERVICE_QUEUE_LIMIT", 256))
+SERVICE_MAX_BODY = int(os.environ.get("SERVICE_MAX_BODY", 50 * 1024 * 1024))
+SERVICE_RETRY_AFTER = 1
+# Longest a GET /jobs/<id>?wait= long-poll is held open
+SERVICE_MAX_WAIT = 60
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error",
+    501: "Not Implemented", 503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """Ends a request with ``status`` and a JSON {"error": message} body"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def summary_options(params):
+    """create_smart_summary arguments from request parameters (JSON body or query string)"""
+    preset_name = params.get("preset", "quick")
+    if preset_name not in PRESETS:
+        raise HTTPError(400, f"Unknown preset: {preset_name!r}")
+    preset = PRESETS[preset_name]
+    try:
+        sentences = int(params["sentences"]) if params.get("sentences") not in (None, "") else None
+        words = int(params["words"]) if params.get("words") not in (None, "") else None
+    except (TypeError, ValueError):
+        raise HTTPError(400, "sentences and words must be integers")
+    if (sentences is not None and sentences < 1) or (words is not None and words < 1):
+        raise HTTPError(400, "sentences and words must be at least 1")
+    priority = params.get("priority", "sentences")
+    if priority not in ("sentences", "words"):
+        raise HTTPError(400, "priority must be 'sentences' or 'words'")
+    try:
+        latency_budget = float(params.get("latency_budget") or 0)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "latency_budget must be a number of seconds")
+    # Written so NaN fails too
+    if not latency_budget >= 0:
+        raise HTTPError(400, "latency_budget must not be negative")
+    use_ai = params.get("use_ai", True)
+    if isinstance(use_ai, str):
+        use_ai = use_ai.lower() not in ("0", "false", "no")
+    return {
+        "target_sentences": sentences or preset["sentences"],
+        "target_words": words or preset["target_words"],
+        "priority": priority,
+        "use_ai": bool(use_ai),
+        "api_key": params.get("api_key"),
+        "mmr_lambda": None if sentences or words else preset["mmr_lambda"],
+        "latency_budget": latency_budget or LATENCY_BUDGET,
+    }
+
+
+def _json_body(body):
+    try:
+        params = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Body must be JSON")
+    if not isinstance(params, dict):
+        raise HTTPError(400, "Body must be a JSON object")
+    return params
+
+
+class SummaryService:
+    """Routes requests to the summarizer, with bounded executors and a queue limit"""
+
+    def __init__(self, io_workers=SERVICE_IO_WORKERS, cpu_workers=SERVICE_CPU_WORKERS,
+                 queue_limit=SERVICE_QUEUE_LIMIT, max_body=SERVICE_MAX_BODY, jobs=None):
+        self.io_executor = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="service-io")
+        self.cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="service-cpu")
+        # JobQueue calls do SQLite work and wait on the queue's lock, so they stay off the event loop;
+        # a pool of their own keeps /health and job polls from queuing behind slow AI calls
+        self.job_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="service-jobs")
+        self.queue_limit = queue_limit
+        self.max_body = max_body
+        self.admitted = 0
+        self.stats = {"requests": 0, "rejected": 0, "errors": 0}
+        self.routes = {
+            ("POST", "/summarize/text"): self.summarize_text,
+            ("POST", "/summarize/url"): self.summarize_url,
+            ("POST", "/summarize/file"): self.summarize_file,
+            ("GET", "/health"): self.health,
+            ("POST", "/jobs/text"): partial(self.submit_job, "text"),
+            ("POST", "/jobs/url"): partial(self.submit_job, "url"),
+            ("POST", "/jobs/file"): partial(self.submit_job, "file"),
+            ("GET", "/jobs"): self.job_stats,
+            ("GET", "/jobs/"): self.job_status,
+        }
+        self.jobs = jobs
+        self.loop = None
+        self._job_waiters = {}
+        if jobs is not None:
+            jobs.listeners.append(self._job_finished)
+
+    async def run(self, executor, func, *args, **kwargs):
+        """Run blocking ``func`` on ``executor``; returns (result, queue_ms, run_ms)"""
+        submitted = time.perf_counter()
+        started = []
+
+        def timed():
+            started.append(time.perf_counter())
+            return func(*args, **kwargs)
+
+        result = await asyncio.get_running_loop().run_in_executor(executor, timed)
+        finished = time.perf_counter()
+        return result, (started[0] - submitted) * 1000, (finished - started[0]) * 1000
+
+    async def call_jobs(self, func, *args):
+        """Run one JobQueue method on the job executor and return its result"""
+        result, _, _ = await self.run(self.job_executor, func, *args)
+        return result
+
+    async def summarize_content(self, content, source_info, options, timings):
+        if content is None:
+            raise HTTPError(422, source_info)
+        if len(content.strip()) < 30:
+            raise HTTPError(422, "❌ Content too short for summarization")
+        executor = self.io_executor if options["use_ai"] else self.cpu_executor
+        (summary, sentences, words), queue_ms, run_ms = await self.run(
+            executor, partial(create_smart_summary, content, **options)
+        )
+        timings["queue_ms"] = timings.get("queue_ms", 0) + queue_ms
+        timings["summarize_ms"] = run_ms
+        if summary.startswith("Error") or summary.startswith("AI Error"):
+            raise HTTPError(500, summary)
+        return {
+            "summary": summary,
+            "sentences": sentences,
+            "words": words,
+            "input_words": len(content.split()),
+            "source": source_info,
+        }
+
+    async def summarize_text(self, query, headers, body, timings):
+        params = _json_body(body)
+        if not isinstance(params.get("text"), str):
+            raise HTTPError(400, "Missing 'text'")
+        return 200, await self.summarize_content(params["text"], None, summary_options(params), timings)
+
+    async def summarize_url(self, query, headers, body, timings):
+        params = _json_body(body)
+        if not isinstance(params.get("url"), str):
+            raise HTTPError(400, "Missing 'url'")
+        options = summary_options(params)
+        (content, source_info), timings["queue_ms"], timings["extract_ms"] = await self.run(
+            self.io_executor, extract_url_content, params["url"]
+        )
+        if content and source_info.startswith("❌"):
+            content = None
+        return 200, await self.summarize_content(content, source_info, options, timings)
+
+    async def summarize_file_stream(self, upload, options, timings):
+        """Extractive summary of an upload whose text is streamed rather than decoded whole"""
+        try:
+            (summary, sentences, words, input_words), timings["queue_ms"], timings["summarize_ms"] = await self.run(
+                self.cpu_executor, summarize_uploaded_file, upload, options["target_sentences"],
+                options["target_words"], options["priority"], options["mmr_lambda"],
+            )
+        except ValueError as e:
+            raise HTTPError(422, str(e))
+        return {
+            "summary": summary,
+            "sentences": sentences,
+            "words": words,
+            "input_words": input_words,
+            "source": upload_source_info(upload),
+        }
+
+    async def summarize_file(self, query, headers, body, timings):
+        if not body:
+            raise HTTPError(400, "Send the file bytes as the request body")
+        options = summary_options(query)
+        upload = UploadedBytes(body, query.get("filename", "upload.txt"), query.get("type"))
+        if not options["use_ai"]:
+            return 200, await self.summarize_file_stream(upload, options, timings)
+        (content, source_info), timings["queue_ms"], timings["extract_ms"] = await self.run(
+            self.cpu_executor, process_uploaded_file, upload
+        )
+        return 200, await self.summarize_content(content, source_info, options, timings)
+
+    async def submit_job(self, kind, query, headers, body, timings):
+        if self.jobs is None:
+            raise HTTPError(404, "Job queue is not enabled")
+        if kind == "file":
+            if not body:
+                raise HTTPError(400, "Send the file bytes as the request body")
+            params, payload = dict(query), body
+            job_params = {"filename": params.get("filename", "upload.txt"), "type": params.get("type")}
+        else:
+            params, payload = _json_body(body), None
+            if not isinstance(params.get(kind), str):
+                raise HTTPError(400, f"Missing '{kind}'")
+            job_params = {kind: params[kind]}
+        options = summary_options(params)
+        api_key = options.pop("api_key")
+        # Background jobs have no caller waiting, so they always wait for the AI summary
+        options["latency_budget"] = 0
+        priority_class = params.get("priority_class", "normal")
+        if priority_class not in PRIORITIES:
+            raise HTTPError(400, f"priority_class must be one of {', '.join(PRIORITIES)}")
+        job_params["options"] = options
+        try:
+            job_id = await self.call_jobs(self.jobs.submit, kind, job_params, payload, priority_class, api_key)
+        except QueueFull as e:
+            raise HTTPError(503, f"Job queue full: {e}", {"Retry-After": str(SERVICE_RETRY_AFTER * 30)})
+        return 202, {"job_id": job_id, "status": "queued", "priority_class": priority_class}
+
+    async def job_status(self, query, headers, body, timings, job_id):
+        if self.jobs is None:
+            raise HTTPError(404, "Job queue is not enabled")
+        try:
+            wait = min(float(query.get("wait", 0)), SERVICE_MAX_WAIT)
+        except ValueError:
+            raise HTTPError(400, "wait must be a number of seconds")
+        job = await self.call_jobs(self.jobs.get, job_id)
+        if job is not None and wait > 0 and job["status"] not in (DONE, FAILED):
+            finished = self.loop.create_future()
+            self._job_waiters.setdefault(job_id, []).append(finished)
+            try:
+                # Re-read in case the job finished before the waiter was registered
+                job = await self.call_jobs(self.jobs.get, job_id)
+                if job["status"] not in (DONE, FAILED):
+                    await asyncio.wait_for(finished, wait)
+                    job = await self.call_jobs(self.jobs.get, job_id)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                waiters = self._job_waiters.get(job_id, [])
+                if finished in waiters:
+                    waiters.remove(finished)
+                if not waiters:
+                    self._job_waiters.pop(job_id, None)
+        if job is None:
+            raise HTTPError(404, f"No job {job_id}")
+        return 200, job
+
+    async def job_stats(self, query, headers, body, timings):
+        if self.jobs is None:
+            raise HTTPError(404, "Job queue is not enabled")
+        return 200, await self.call_jobs(self.jobs.stats)
+
+    def _job_finished(self, job_id):
+        """JobQueue listener (runs on a worker thread): wake long-polls for ``job_id``"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._wake_job_waiters, job_id)
+
+    def _wake_job_waiters(self, job_id):
+        for finished in self._job_waiters.pop(job_id, []):
+            if not finished.done():
+                finished.set_result(None)
+
+    async def health(self, query, headers, body, timings):
+        return 200, {
+            "status": "ok",
+            "admitted": self.admitted,
+            "queue_limit": self.queue_limit,
+            **self.stats,
+            "summary_cache": summary_cache.stats(),
+            "extraction_cache": extraction_cache.stats(),
+            "hf_client": hf_client_stats(),
+            "backends": backend_stats(),
+            "latency_race": race_stats(),
+            "coalescing": {"url": url_flight.stats(), "ai": ai_flight.stats()},
+            "jobs": await self.call_jobs(self.jobs.stats) if self.jobs is not None else None,
+        }
+
+    async def dispatch(self, method, target, headers, body):
+        """Route one request; returns (status, payload, extra_headers)"""
+        started = time.perf_counter()
+        parts = urlsplit(target)
+        handler = self.routes.get((method, parts.path)) if not parts.path.endswith("/") else None
+        # Paths like /jobs/<id> route through a "/jobs/" prefix entry that receives the rest as an argument
+        prefix, _, rest = parts.path.rpartition("/")
+        if handler is None and rest and (method, prefix + "/") in self.routes:
+            handler = partial(self.routes[(method, prefix + "/")], job_id=rest)
+        if handler is None:
+            if any(path == parts.path and not path.endswith("/") for _, path in self.routes):
+                return 405, {"error": f"{method} not allowed on {parts.path}"}, {}
+            return 404, {"error": f"No route for {parts.path}"}, {}
+
+        # Cheap routes skip admission so health checks keep answering under load
+        limited = method == "POST"
+        if limited and self.admitted >= self.queue_limit:
+            self.stats["rejected"] += 1
+            return 503, {"error": "Server busy, retry shortly"}, {"Retry-After": str(SERVICE_RETRY_AFTER)}
+
+        self.stats["requests"] += 1
+        timings = {}
+        if limited:
+            self.admitted += 1
+        try:
+            status, payload = await handler(dict(parse_qsl(parts.query)), headers, body, timings)
+            extra = {}
+        except HTTPError as e:
+            status, payload, extra = e.status, {"error": str(e)}, e.headers
+        except Exception as e:
+            status, payload, extra = 500, {"error": f"{type(e).__name__}: {e}"}, {}
+        finally:
+            if limited:
+                self.admitted -= 1
+        if status >= 400:
+            self.stats["errors"] += 1
+        timings["total_ms"] = (time.perf_counter() - started) * 1000
+        if limited:
+            payload["timings"] = {name: round(ms, 1) for name, ms in timings.items()}
+        return status, payload, extra
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes"""
+        try:
+            while True:
+                try:
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError("negative Content-Length")
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Malformed request"}, close=True)
+                    break
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    await self.respond(writer, 501, {"error": "Chunked bodies are not supported"}, close=True)
+                    break
+                if length > self.max_body:
+                    await self.respond(writer, 413, {"error": f"Body over {self.max_body} bytes"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, extra = await self.dispatch(method, target, headers, body)
+                await self.respond(writer, status, payload, extra, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, extra_headers=None, close=False):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'close' if close else 'keep-alive'}",
+        ]
+        head += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m summarizer.service", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--io-workers", type=int, default=SERVICE_IO_WORKERS)
+    parser.add_argument("--cpu-workers", type=int, default=SERVICE_CPU_WORKERS)
+    parser.add_argument("--queue-limit", type=int, default=SERVICE_QUEUE_LIMIT)
+    parser.add_argument("--job-db", default=JOB_DB_PATH, help="SQLite file holding background jobs")
+    parser.add_argument("--job-workers", type=int, default=JOB_WORKERS)
+    args = parser.parse_args(argv)
+
+    jobs = JobQueue(args.job_db, workers=args.job_workers)
+    service = SummaryService(args.io_workers, args.cpu_workers, args.queue_limit, jobs=jobs)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
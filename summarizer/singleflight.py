@@ -0,0 +1,56 @@
+"""Single-flight coalescing of identical concurrent calls"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Collapses concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block on the same Future and get the same result (or the
+    same exception). Nothing is remembered once the call finishes, so this
+    complements a cache rather than replacing it: it covers the window
+    before the first result has been stored.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.executions = 0
+
+    def do(self, key, func, *args, **kwargs):
+        """Return ``func(*args, **kwargs)``, sharing one execution among concurrent callers of ``key``"""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self.executions += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def stats(self):
+        """Calls, actual executions, and the share of calls served by another caller's execution"""
+        with self._lock:
+            shared = self.calls - self.executions
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "shared": shared,
+                "dedup_ratio": shared / self.calls if self.calls else 0.0,
+                "in_flight": len(self._in_flight),
+            }
@@ -0,0 +1,591 @@
+"""Extractive and AI-powered summary builders"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from .cache import TTLCache, content_hash, normalize_text
+from .backends import get_backend
+from .extractors import iter_uploaded_file_text
+from .mapreduce import CHUNK_WORDS, map_reduce_text
+from .paraphrase import default_rule_set
+from .presets import PRESETS
+from .ranking import (
+    RANKING_AVAILABLE,
+    SUMMARY_RANKER,
+    mmr_select,
+    mmr_within_budget,
+    rank_sentences,
+    top_in_order,
+)
+from .selection import WORD_TOLERANCE, prefix_within_budget, select_within_budget
+from .singleflight import SingleFlight
+from .text import (
+    clean_and_split_sentences,
+    iter_sentences,
+    sentence_text,
+    smart_paraphrase,
+    split_sentence_spans,
+)
+
+
+# Shared by every session in the process; set SUMMARY_CACHE_DB to keep it warm across restarts
+summary_cache = TTLCache(
+    max_entries=int(os.environ.get("SUMMARY_CACHE_SIZE", 512)),
+    ttl=float(os.environ.get("SUMMARY_CACHE_TTL", 6 * 3600)),
+    max_bytes=int(os.environ.get("SUMMARY_CACHE_BYTES", 16 * 1024 * 1024)),
+    db_path=os.environ.get("SUMMARY_CACHE_DB") or None,
+)
+
+def summary_cache_key(text, target_sentences, target_words, priority, use_ai, model_id=None, mmr_lambda=None):
+    """Cache key for a summary request: normalized text plus every parameter that shapes the output"""
+    if model_id is None:
+        model_id = get_backend().model_id if use_ai else ""
+    # Rule edits change the output, so the loaded rule set is part of the key
+    rules = default_rule_set().fingerprint
+    return content_hash(normalize_text(text), target_sentences, target_words, priority, use_ai, model_id, rules,
+                        mmr_lambda)
+
+def _select_positional(sentences, target_sentences):
+    """Pick the first sentence, an even spread of the middle third and the last sentence"""
+    if len(sentences) <= target_sentences:
+        selected_sentences = sentences
+    else:
+        # Select sentences from beginning, middle, and end
+        if target_sentences >= 3:
+            # Take first sentence, some from middle, and last sentence
+            selected_sentences = [sentences[0]]
+            
+            if target_sentences > 2:
+                middle_count = target_sentences - 2
+                middle_start = len(sentences) // 3
+                middle_end = (2 * len(sentences)) // 3
+                middle_sentences = sentences[middle_start:middle_end]
+                
+                if len(middle_sentences) >= middle_count:
+                    step = len(middle_sentences) // middle_count
+                    selected_middle = [middle_sentences[i] for i in range(0, len(middle_sentences), step)][:middle_count]
+                else:
+                    selected_middle = middle_sentences
+                
+                selected_sentences.extend(selected_middle)
+            
+            if len(sentences) > 1:
+                selected_sentences.append(sentences[-1])
+        else:
+            selected_sentences = sentences[:target_sentences]
+    
+    return list(selected_sentences)
+
+# Relevance vs. novelty trade-off for MMR selection; 1.0 turns redundancy filtering off
+MMR_LAMBDA = float(os.environ.get("SUMMARY_MMR_LAMBDA", 0.7))
+
+class RankedDocument:
+    """Sentences of one document with scores and lengths computed once.
+
+    ``sentences`` are strings, or spans into ``document`` when it is given.
+    Ranking keeps a bounded pool of the most central sentences (see
+    ranking.rank_sentences) and every ``select`` call reuses it, so several
+    summaries of one document cost a single split-and-score pass.
+    """
+
+    def __init__(self, sentences, document=None, method=None):
+        self.sentences = sentences
+        self.document = document
+        self.method = method or SUMMARY_RANKER
+        self.ranked = self.method != "position" and RANKING_AVAILABLE and len(sentences) > 1
+        self._pool = None
+        self._scores = None
+        self._vectors = None
+        self._lengths = None
+        # Similarity rows of MMR picks, shared by every select() on this document
+        self._rows = {}
+
+    def _rank(self):
+        if self._scores is not None:
+            return
+        if not self.ranked:
+            # Simple lead bias when ranking is unavailable
+            self._pool = list(range(len(self.sentences)))
+            self._scores = [1.0 / (1 + i) for i in self._pool]
+            return
+        sentences = self.sentences
+        if self.document is not None:
+            sentences = [(self.document, start, end) for start, end in sentences]
+        self._pool, scores, self._vectors = rank_sentences(sentences, self.method)
+        self._scores = scores.tolist()
+
+    @property
+    def scores(self):
+        """Scores of the candidate pool, aligned with ``pool``"""
+        self._rank()
+        return self._scores
+
+    @property
+    def pool(self):
+        """Indices of the candidate sentences, in document order"""
+        self._rank()
+        return self._pool
+
+    @property
+    def lengths(self):
+        """Word counts of the candidate pool, aligned with ``pool``"""
+        if self._lengths is None:
+            if self.document is not None:
+                self._lengths = [len(self.document[self.sentences[i][0]:self.sentences[i][1]].split())
+                                 for i in self.pool]
+            else:
+                self._lengths = [len(self.sentences[i].split()) for i in self.pool]
+        return self._lengths
+
+    def select(self, target_sentences, target_words, priority="sentences", mmr_lambda=None):
+        """Choose summary sentences, kept in document order.
+
+        With priority "sentences" this is ``target_sentences`` sentences; with
+        "words" it is the best-scoring set whose length fits ``target_words``
+        (plus WORD_TOLERANCE). When ``mmr_lambda`` is below 1, picks are made
+        by Maximal Marginal Relevance so near-duplicate sentences aren't both
+        chosen. Falls back to positional selection when NumPy/SciPy are
+        missing or the ranker is set to "position".
+        """
+        sentences = self.sentences
+        mmr_lambda = MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+        if priority != "words" and (len(sentences) <= target_sentences or not self.ranked):
+            return _select_positional(sentences, target_sentences)
+        
+        self._rank()
+        use_mmr = self.ranked and mmr_lambda < 1
+        budget = target_words + WORD_TOLERANCE
+        if priority == "words" and use_mmr:
+            # Redundancy depends on what is already chosen, so budgeted MMR picks greedily
+            # against the chosen set; the exact knapsack serves the redundancy-free case
+            chosen = mmr_within_budget(self._scores, self._vectors, self.lengths, budget, mmr_lambda, self._rows)
+        elif priority == "words":
+            chosen = select_within_budget(self._scores, self.lengths, budget)
+        elif use_mmr:
+            chosen = mmr_select(self._scores, self._vectors, target_sentences, mmr_lambda, self._rows)
+        else:
+            chosen = top_in_order(self._scores, target_sentences)
+        return [sentences[self._pool[i]] for i in chosen]
+
+def _finish_summary(selected_sentences):
+    """Paraphrase the chosen sentences in one pass and count the result"""
+    result = smart_paraphrase(' '.join(selected_sentences))
+    word_count = len(result.split())
+    sentence_count = len(selected_sentences)
+    
+    return result, sentence_count, word_count
+
+def create_basic_summary(text, target_sentences, target_words, priority="sentences", mmr_lambda=None):
+    """Create a basic summary when AI is not available"""
+    # Work on offsets; only the chosen sentences are turned into strings
+    ranked = RankedDocument(split_sentence_spans(text), document=text)
+    selected = ranked.select(target_sentences, target_words, priority, mmr_lambda)
+    selected_sentences = [sentence_text(text, span) for span in selected]
+    
+    return _finish_summary(selected_sentences)
+
+def sample_evenly(items, capacity):
+    """Evenly spaced sample of at most ``capacity`` items from a stream of unknown length.
+
+    Keeps every stride-th item and, when the sample overflows, drops every
+    other one and doubles the stride. The first and last items are always kept.
+    """
+    sample = []
+    stride = 1
+    last = None
+    for index, item in enumerate(items):
+        last = (index, item)
+        if index % stride == 0:
+            sample.append(item)
+            if len(sample) > capacity:
+                sample = sample[::2]
+                stride *= 2
+    if last is not None and last[0] % stride != 0:
+        sample.append(last[1])
+    return sample
+
+# Candidate pool for streamed documents; a summary needs far fewer sentences than this
+STREAM_CANDIDATES = 512
+
+def create_basic_summary_from_stream(pieces, target_sentences, target_words, priority="sentences",
+                                     max_candidates=STREAM_CANDIDATES, mmr_lambda=None, counts=None):
+    """Basic summary of text arriving as an iterable of pieces (see extractors.iter_uploaded_file_text).
+
+    Sentences are segmented as they arrive and reduced to an evenly spaced
+    candidate pool, so peak memory is bounded by ``max_candidates`` sentences
+    however long the document is. A ``counts`` dict, if given, receives the
+    input's "words" and "chars".
+    """
+    sentences = iter_sentences(pieces)
+    if counts is not None:
+        sentences = _counted(sentences, counts)
+    candidates = sample_evenly(sentences, max(max_candidates, 4 * target_sentences))
+    ranked = RankedDocument(candidates)
+    return _finish_summary(ranked.select(target_sentences, target_words, priority, mmr_lambda))
+
+def _counted(sentences, counts):
+    counts["words"] = counts["chars"] = 0
+    for sentence in sentences:
+        counts["words"] += len(sentence.split())
+        counts["chars"] += len(sentence)
+        yield sentence
+
+def summarize_uploaded_file(uploaded_file, target_sentences, target_words, priority="sentences", mmr_lambda=None):
+    """Extractive summary of an upload read piece by piece, never holding its whole text.
+
+    Returns (summary, sentences, words, input_words). Raises ValueError with
+    a displayable message when the file can't be read or is too short.
+    """
+    counts = {}
+    try:
+        summary, sentences, words = create_basic_summary_from_stream(
+            iter_uploaded_file_text(uploaded_file), target_sentences, target_words, priority,
+            mmr_lambda=mmr_lambda, counts=counts,
+        )
+    except RuntimeError as e:
+        raise ValueError(f"❌ {e}") from e
+    except Exception as e:
+        raise ValueError(f"❌ Error reading file: {e}") from e
+    if counts["chars"] < 30:
+        raise ValueError("❌ Content too short for summarization")
+    return summary, sentences, words, counts["words"]
+
+def _ai_summary_sentences(text, target_sentences, target_words, api_key, backend, on_chunk=None):
+    """Ask the backend for one abstractive summary; returns (sentences, error)"""
+    # Documents longer than the model window are condensed chunk by chunk first
+    if len(text.split()) > CHUNK_WORDS:
+        text, error = map_reduce_text(text, target_sentences, target_words, api_key, backend=backend,
+                                      on_chunk=on_chunk)
+        if error:
+            return None, error
+    
+    max_length = max(target_words + 20, target_sentences * 15)
+    min_length = max(target_words - 10, target_sentences * 10, 20)
+    
+    # Query the model
+    summary_text, error = backend.summarize([text], max_length, min_length, api_key)[0]
+    
+    if error:
+        return None, error
+    
+    # Clean and split sentences
+    return clean_and_split_sentences(summary_text), None
+
+def _trim_ai_sentences(sentences, target_sentences, target_words, priority="sentences"):
+    """Cut an abstractive summary down to the requested size, keeping its opening"""
+    if priority == "words":
+        budget = target_words + WORD_TOLERANCE
+        return sentences[:prefix_within_budget([len(s.split()) for s in sentences], budget)]
+    return sentences[:target_sentences]
+
+# Identical AI requests in flight at once share one backend call
+ai_flight = SingleFlight()
+
+def _ai_flight_key(kind, text, target_sentences, target_words, backend, api_key, *extra):
+    """ai_flight key for one backend request; callers with different API keys never share a result"""
+    return content_hash(kind, normalize_text(text), target_sentences, target_words, backend.model_id,
+                        content_hash("api_key", api_key or ""), *extra)
+
+def create_ai_summary(text, target_sentences, target_words, api_key=None, backend=None, priority="sentences",
+                      on_chunk=None):
+    """Create AI-powered summary using the configured backend (Hugging Face API by default).
+
+    Concurrent calls for the same normalized text and parameters share one
+    backend request; only the caller that started it receives ``on_chunk``
+    progress.
+    """
+    try:
+        backend = backend or get_backend()
+    except Exception as e:
+        return f"AI Error: {str(e)}", 0, 0
+    key = _ai_flight_key("ai", text, target_sentences, target_words, backend, api_key, priority)
+    return ai_flight.do(key, _create_ai_summary, text, target_sentences, target_words, api_key, backend, priority,
+                        on_chunk)
+
+def _create_ai_summary(text, target_sentences, target_words, api_key, backend, priority, on_chunk):
+    try:
+        sentences, error = _ai_summary_sentences(text, target_sentences, target_words, api_key, backend, on_chunk)
+        
+        if error:
+            return f"AI Error: {error}", 0, 0
+        
+        # Adjust based on target
+        return _finish_summary(_trim_ai_sentences(sentences, target_sentences, target_words, priority))
+        
+    except Exception as e:
+        return f"AI Error: {str(e)}", 0, 0
+
+# Seconds the AI path may take before the extractive summary is served instead; 0 waits for the AI
+LATENCY_BUDGET = float(os.environ.get("SUMMARY_LATENCY_BUDGET", 0))
+_race_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("SUMMARY_RACE_WORKERS", 16)), thread_name_prefix="summary-race"
+)
+_race_lock = threading.Lock()
+_race_stats = {"raced": 0, "ai_in_budget": 0, "draft_served": 0, "upgraded": 0, "ai_failed": 0}
+
+def _count_race(field):
+    with _race_lock:
+        _race_stats[field] += 1
+
+def race_stats():
+    """How often raced requests got the AI summary in budget, fell back to the draft, or upgraded later"""
+    with _race_lock:
+        return dict(_race_stats)
+
+def _race_ai_summary(text, target_sentences, target_words, priority, api_key, backend, mmr_lambda,
+                     latency_budget, cache, key, on_upgrade):
+    """Run the AI and extractive paths side by side and return whichever result the deadline allows.
+
+    The AI call starts on a worker thread while the extractive summary is
+    built here. If the AI result is in by ``latency_budget`` seconds it is
+    returned; otherwise the extractive one is. An AI result that lands late
+    is still cached under ``key`` and handed to ``on_upgrade``, so the next
+    identical request (or the caller, in place) gets the better summary.
+    """
+    deadline = time.monotonic() + latency_budget
+    _count_race("raced")
+    future = _race_executor.submit(
+        create_ai_summary, text, target_sentences, target_words, api_key, backend, priority
+    )
+    draft = create_basic_summary(text, target_sentences, target_words, priority, mmr_lambda)
+
+    try:
+        result = future.result(timeout=max(deadline - time.monotonic(), 0))
+    except FutureTimeout:
+        _count_race("draft_served")
+
+        def upgrade(done):
+            result = done.result()
+            if result[0].startswith("AI Error"):
+                _count_race("ai_failed")
+                return
+            _count_race("upgraded")
+            if key is not None:
+                cache.set(key, result)
+            if on_upgrade is not None:
+                on_upgrade(result)
+
+        future.add_done_callback(upgrade)
+        return draft
+
+    if result[0].startswith("AI Error"):
+        _count_race("ai_failed")
+        return draft
+    _count_race("ai_in_budget")
+    if key is not None:
+        cache.set(key, result)
+    return result
+
+def create_smart_summary(text, target_sentences, target_words, priority="sentences", use_ai=True, api_key=None,
+                         cache=summary_cache, backend=None, mmr_lambda=None, latency_budget=LATENCY_BUDGET,
+                         on_upgrade=None):
+    """Create summary using available methods.
+
+    With a ``latency_budget`` (seconds), the AI and extractive paths race and
+    the extractive summary is returned if the AI one isn't ready in time;
+    ``on_upgrade(result)`` is then called from a worker thread if the AI
+    summary arrives later. Without one, the AI path runs to completion.
+    """
+    backend = backend or get_backend()
+    key = None
+    if cache is not None:
+        key = summary_cache_key(text, target_sentences, target_words, priority, use_ai,
+                                backend.model_id if use_ai else "", mmr_lambda)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if use_ai and latency_budget:
+        return _race_ai_summary(text, target_sentences, target_words, priority, api_key, backend, mmr_lambda,
+                                latency_budget, cache, key, on_upgrade)
+
+    if use_ai:
+        result = create_ai_summary(text, target_sentences, target_words, api_key, backend, priority)
+        if not result[0].startswith("AI Error"):
+            if key is not None:
+                cache.set(key, result)
+            return result
+        # Don't cache the fallback, so the next request gets another shot at the AI path
+        return create_basic_summary(text, target_sentences, target_words, priority, mmr_lambda)
+    
+    # Fallback to basic summary
+    result = create_basic_summary(text, target_sentences, target_words, priority, mmr_lambda)
+    if key is not None:
+        cache.set(key, result)
+    return result
+
+def iter_smart_summary(text, target_sentences, target_words, priority="sentences", use_ai=True, api_key=None,
+                       cache=summary_cache, backend=None, mmr_lambda=None):
+    """create_smart_summary as a stream of progress events, for showing results as they form.
+
+    Yields dicts keyed by "stage":
+
+    - "draft": the extractive summary, at once, while the AI call runs
+    - "chunk": a map-reduce chunk summary ("pass", "index", "total") as it lands
+    - "final": the finished summary, with "method" ("ai" or "extractive") and
+      "error" when the AI path failed and the draft stands in for it
+
+    Every event but "chunk" carries "summary", "sentences" and "words". A
+    cache hit, or ``use_ai=False``, yields only the final event.
+    """
+    backend = backend or get_backend()
+    key = None
+    if cache is not None:
+        key = summary_cache_key(text, target_sentences, target_words, priority, use_ai,
+                                backend.model_id if use_ai else "", mmr_lambda)
+        cached = cache.get(key)
+        if cached is not None:
+            yield _summary_event("final", cached, method="ai" if use_ai else "extractive", error=None)
+            return
+
+    if not use_ai:
+        draft = create_basic_summary(text, target_sentences, target_words, priority, mmr_lambda)
+        if key is not None:
+            cache.set(key, draft)
+        yield _summary_event("final", draft, method="extractive", error=None)
+        return
+
+    # The AI call runs on a worker thread; its progress comes back through a queue so
+    # the caller's thread (Streamlit's script thread, say) does all the rendering
+    events = queue.Queue()
+
+    def on_chunk(pass_number, index, total, summary_text):
+        events.put({"stage": "chunk", "pass": pass_number, "index": index, "total": total, "summary": summary_text})
+
+    def run():
+        events.put({"stage": "done", "result": create_ai_summary(
+            text, target_sentences, target_words, api_key, backend, priority, on_chunk
+        )})
+
+    # Start the request first so ranking the draft overlaps the model's latency
+    threading.Thread(target=run, name="smart-summary", daemon=True).start()
+    draft = create_basic_summary(text, target_sentences, target_words, priority, mmr_lambda)
+    yield _summary_event("draft", draft)
+    while True:
+        event = events.get()
+        if event["stage"] != "done":
+            yield event
+            continue
+        result = event["result"]
+        if result[0].startswith("AI Error"):
+            # Don't cache the fallback, so the next request gets another shot at the AI path
+            yield _summary_event("final", draft, method="extractive", error=result[0])
+        else:
+            if key is not None:
+                cache.set(key, result)
+            yield _summary_event("final", result, method="ai", error=None)
+        return
+
+def _summary_event(stage, result, **extra):
+    summary, sentences, words = result
+    return {"stage": stage, "summary": summary, "sentences": sentences, "words": words, **extra}
+
+def _cached_presets(text, targets, priority, use_ai, cache, model_id):
+    """Cache keys for every target and the results already cached, as (keys, results)"""
+    keys = {}
+    results = {}
+    if cache is None:
+        return keys, results
+    for name, target in targets.items():
+        keys[name] = summary_cache_key(text, target["sentences"], target["target_words"], priority, use_ai,
+                                       model_id, target.get("mmr_lambda"))
+        cached = cache.get(keys[name])
+        if cached is not None:
+            # Fallbacks are never cached, so a hit is whatever method was asked for
+            results[name] = (*cached, "ai" if use_ai else "extractive")
+    return keys, results
+
+def create_preset_summaries(text, targets=None, priority="sentences", use_ai=True, api_key=None,
+                            cache=summary_cache, backend=None, on_chunk=None):
+    """Summaries of one document for every target, from one split-and-score pass.
+
+    ``targets`` maps a name to a dict with "sentences", "target_words" and
+    optionally "mmr_lambda", like the entries of PRESETS (the default).
+    Returns {name: (summary, sentence_count, word_count, method)}, where
+    method is "ai" or "extractive". With AI on, the model is asked once for
+    the longest summary and shorter targets are cut from it; if that call
+    fails every target falls back to the extractive ranking. ``on_chunk`` is
+    passed to the map-reduce for that call. Results are stored in the summary
+    cache, so a later create_smart_summary call for any one of them is a
+    cache hit.
+    """
+    targets = PRESETS if targets is None else targets
+    backend = backend or get_backend()
+    keys, results = _cached_presets(text, targets, priority, use_ai, cache, backend.model_id if use_ai else "")
+    missing = {name: target for name, target in targets.items() if name not in results}
+    if not missing:
+        return results
+    
+    if use_ai:
+        longest = max(missing.values(), key=lambda t: (t["target_words"], t["sentences"]))
+        key = _ai_flight_key("ai-sentences", text, longest["sentences"], longest["target_words"], backend, api_key)
+        try:
+            sentences, error = ai_flight.do(
+                key, _ai_summary_sentences, text, longest["sentences"], longest["target_words"], api_key, backend,
+                on_chunk
+            )
+        except Exception as e:
+            sentences, error = None, str(e)
+        if not error:
+            for name, target in missing.items():
+                trimmed = _trim_ai_sentences(sentences, target["sentences"], target["target_words"], priority)
+                summary = _finish_summary(trimmed)
+                results[name] = (*summary, "ai")
+                if cache is not None:
+                    cache.set(keys[name], summary)
+            return results
+    
+    ranked = RankedDocument(split_sentence_spans(text), document=text)
+    for name, target in missing.items():
+        selected = ranked.select(target["sentences"], target["target_words"], priority, target.get("mmr_lambda"))
+        summary = _finish_summary([sentence_text(text, span) for span in selected])
+        results[name] = (*summary, "extractive")
+        # A fallback after a failed AI call isn't cached, so the next request retries the model
+        if cache is not None and not use_ai:
+            cache.set(keys[name], summary)
+    return results
+
+def iter_preset_summaries(text, draft_target, targets=None, priority="sentences", use_ai=True, api_key=None,
+                          cache=summary_cache, backend=None):
+    """create_preset_summaries as a stream of progress events, like iter_smart_summary.
+
+    Yields a "draft" event (the extractive summary for ``targets[draft_target]``)
+    while the AI call runs, "chunk" events as map-reduce chunks land, and a
+    "final" event whose "results" is the create_preset_summaries dict. A
+    full cache hit, or ``use_ai=False``, yields only the final event.
+    """
+    targets = PRESETS if targets is None else targets
+    backend = backend or get_backend()
+    if not use_ai or len(_cached_presets(text, targets, priority, use_ai, cache, backend.model_id)[1]) == len(targets):
+        yield {"stage": "final", "results": create_preset_summaries(text, targets, priority, use_ai, api_key, cache,
+                                                                    backend)}
+        return
+
+    events = queue.Queue()
+
+    def on_chunk(pass_number, index, total, summary_text):
+        events.put({"stage": "chunk", "pass": pass_number, "index": index, "total": total, "summary": summary_text})
+
+    def run():
+        try:
+            results = create_preset_summaries(text, targets, priority, use_ai, api_key, cache, backend, on_chunk)
+        except Exception as e:
+            results = e
+        events.put({"stage": "final", "results": results})
+
+    # Start the request first so ranking the draft overlaps the model's latency
+    threading.Thread(target=run, name="preset-summaries", daemon=True).start()
+    target = targets[draft_target]
+    draft = create_basic_summary(text, target["sentences"], target["target_words"], priority,
+                                 target.get("mmr_lambda"))
+    yield _summary_event("draft", draft)
+    while True:
+        event = events.get()
+        if isinstance(event.get("results"), Exception):
+            raise event["results"]
+        yield event
+        if event["stage"] == "final":
+            return
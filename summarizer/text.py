@@ -0,0 +1,103 @@
+"""Sentence splitting and paraphrasing helpers"""
+import re
+
+from .paraphrase import default_rule_set
+
+
+# Sentence end: terminal punctuation plus closing quotes/brackets, then whitespace and a capital
+_SENTENCE_END = re.compile(r'([.!?]+["\'\u201d\u2019)\]]*)\s+(?=["\'\u201c\u2018(\[]?[A-Z])')
+# A lone period after these is an abbreviation ("Dr.", "U.S.", "e.g.", "J."), not a sentence end
+_ABBREVIATION = re.compile(
+    r'(?<![\w.])(?:Dr|Mr|Mrs|Ms|Prof|Sr|Jr|St|Mt|Gen|Gov|Sen|Rep|Lt|Col|Capt|Sgt|Inc|Ltd|Co|Corp|'
+    r'vs|etc|No|Fig|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec|[A-Za-z](?:\.[A-Za-z])*)\.$'
+)
+# Titles always lead into what follows; the other abbreviations can also close a sentence
+_TITLE = re.compile(
+    r'(?<![\w.])(?:Dr|Mr|Mrs|Ms|Prof|St|Mt|Gen|Gov|Sen|Rep|Lt|Col|Capt|Sgt|vs|Fig|e\.g|i\.e)\.$'
+)
+# Words that usually open a sentence; after "U.S." or "an A." one of these means a new sentence
+_SENTENCE_STARTER = re.compile(
+    r'["\'\u201c\u2018(\[]?(?:The|A|An|This|That|These|Those|It|Its|He|She|We|They|I|You|There|Here|'
+    r'Then|But|And|So|Yet|However|Meanwhile|Also|Still|Now|Today|In|On|At|For|After|Before|When|While|If|'
+    r'As|Although|Because|Since|His|Her|Our|Their|My|What|Why|How|Who|Some|Many|Most|All|Each|Every|'
+    r'One|Both|Such|Another|Other|No|Not)(?=[\s,])'
+)
+_LEADING_SPACE = re.compile(r'\s*')
+_MIN_SENTENCE_CHARS = 10
+
+def split_sentence_spans(text):
+    """Return (start, end) offsets of each sentence in ``text``.
+
+    One scan over the original buffer with precompiled patterns; no copy of
+    the document is made. Fragments shorter than 10 characters and trailing
+    ellipses are dropped, as in clean_and_split_sentences.
+    """
+    spans = []
+    append = spans.append
+    abbreviation = _ABBREVIATION.search
+    title = _TITLE.search
+    starter = _SENTENCE_STARTER.match
+    start = _LEADING_SPACE.match(text).end()
+    
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end(1)
+        if match.group(1) == '.' and abbreviation(text, max(start, end - 12), end):
+            if title(text, max(start, end - 12), end) or not starter(text, match.end()):
+                continue
+        if end - start >= _MIN_SENTENCE_CHARS and not text.endswith('..', start, end):
+            append((start, end))
+        start = match.end()
+    
+    end = len(text.rstrip())
+    if end - start >= _MIN_SENTENCE_CHARS and not text.endswith('..', start, end):
+        append((start, end))
+    return spans
+
+def sentence_text(text, span):
+    """Materialize one sentence span as clean text ending in punctuation"""
+    sentence = ' '.join(text[span[0]:span[1]].split())
+    if not sentence.endswith(('.', '!', '?', '"', "'", '\u201d', '\u2019', ')', ']')):
+        sentence += '.'
+    return sentence
+
+# Text with no sentence break for this long is emitted anyway, keeping the stream buffer bounded
+MAX_SENTENCE_CHARS = 20000
+
+def iter_sentences(pieces, max_sentence_chars=MAX_SENTENCE_CHARS):
+    """Yield clean sentences from an iterable of text pieces as soon as each one completes.
+
+    Only the unfinished tail of the text is buffered, so memory stays bounded
+    by the longest sentence rather than by the document. Sentences match
+    clean_and_split_sentences on the joined text.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        spans = split_sentence_spans(buffer)
+        if not spans:
+            if len(buffer) > max_sentence_chars:
+                yield sentence_text(buffer, (0, len(buffer.rstrip())))
+                buffer = ""
+            continue
+        
+        # The last span may still grow when more text arrives, so hold it back
+        consumed = 0
+        for span in spans[:-1]:
+            yield sentence_text(buffer, span)
+            consumed = span[1]
+        tail = buffer[consumed:]
+        if len(tail) > max_sentence_chars:
+            yield sentence_text(tail, (0, len(tail.rstrip())))
+            tail = ""
+        buffer = tail
+    
+    for span in split_sentence_spans(buffer):
+        yield sentence_text(buffer, span)
+
+def clean_and_split_sentences(text):
+    """Clean text and split into proper sentences"""
+    return [sentence_text(text, span) for span in split_sentence_spans(text)]
+
+def smart_paraphrase(text):
+    """Enhanced paraphrasing with the rule files in summarizer/rules (see paraphrase.py)"""
+    return default_rule_set().rewrite(text)